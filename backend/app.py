@@ -1,23 +1,38 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, request, jsonify, make_response, Response
 from flask_cors import CORS
 from flask_session import Session
 from flask_mail import Mail, Message
 import bcrypt
 import jwt
+import csv
+import io
 import json
 import os
 from datetime import datetime, timedelta, timezone
 import re
+import secrets
 import logging
 import logging.handlers
-import threading
 import time
 from rate_limit import rate_limit
-from scheduler import admit
+from pagination import paginate, page_response, parse_limit, PaginationError
+from scheduler import admit, QueueFull, queue_stats, start_forwarder
+from task_store import get_result, purge_expired as purge_expired_results
+from timer_wheel import JobScheduler
+from task_metrics import snapshot as task_metrics_snapshot, purge_old as purge_old_task_metrics
+from task_retry import list_dead_letters, dead_letter_stats, replay_dead_letter, delete_dead_letter
+from redis_client import redis_client
+from log_cleanup import cleanup_old_logs
 from chatbox import get_chatbot_response
+from schema_cache import schema_cache
+from json_provider import FastJSONProvider
+from dashboard_cache import dashboard_field_cache
+from collection_versions import conditional_list, ensure_collection_versions
 from dynamicDatabase import (
     setup_metadata_table, create_dynamic_database, insert_dynamic_data, 
-    fetch_dynamic_data
+    fetch_dynamic_data, bulk_insert_dynamic_data, parse_ndjson, export_dynamic_data,
+    query_dynamic_data, query_args, aggregate_dynamic_data, create_dynamic_index,
+    list_dynamic_indexes, drop_dynamic_index, sync_dynamic_data, SyncExpired
 )
 from email_utils import (
     send_appointment_scheduled_email, send_appointment_confirmed_email,
@@ -27,9 +42,10 @@ from email_utils import (
 from config import (
     SECRET_KEY, DEBUG, HOST, PORT, SQLALCHEMY_DATABASE_URI,
     SQLALCHEMY_TRACK_MODIFICATIONS, SESSION_TYPE, MAIL_SERVER, MAIL_PORT,
-    MAIL_USE_TLS, MAIL_USE_SSL, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER
+    MAIL_USE_TLS, MAIL_USE_SSL, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER,
+    MAX_USER_TASK_PRIORITY, JOB_SCHEDULER_TICK, JOB_LEADER_LOCK_FILE
 )
-from models import db, User, UserSession, decode_token, get_user_by_token, get_session_by_refresh_token, Hospital, Farmer, Doctor, Appointment, Alert, Service, Page
+from models import db, User, UserSession, decode_token, get_user_by_token, get_session_by_refresh_token, Hospital, Farmer, Doctor, Appointment, Alert, Service, Page, DashboardField
 from system_health_middleware import register_system_health_middleware
 from system_health_routes import system_health_bp
 
@@ -123,6 +139,7 @@ def require_auth(f):
     return wrapper
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed; dates are written as ISO 8601
 CORS(app, supports_credentials=True)  # Enable CORS with credentials
 
 # Configure logging with rotation
@@ -154,29 +171,30 @@ app.config['MAIL_USERNAME'] = MAIL_USERNAME
 app.config['MAIL_PASSWORD'] = MAIL_PASSWORD
 app.config['MAIL_DEFAULT_SENDER'] = MAIL_DEFAULT_SENDER
 
-# Background log cleanup function
-def log_cleanup_worker():
-    """Background worker to periodically clean up old log files"""
-    while True:
-        try:
-            # Import here to avoid circular imports
-            import subprocess
-            import sys
-            # Run log cleanup every 24 hours
-            result = subprocess.run([sys.executable, 'log_cleanup.py'],
-                                  cwd=os.path.dirname(__file__),
-                                  capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                logging.info(f"Log cleanup: {result.stdout.strip()}")
-        except Exception as e:
-            logging.error(f"Log cleanup failed: {e}")
-        finally:
-            # Sleep for 24 hours
-            time.sleep(24 * 60 * 60)
-
-# Start background log cleanup thread
-cleanup_thread = threading.Thread(target=log_cleanup_worker, daemon=True)
-cleanup_thread.start()
+# Recurring background jobs (run by one leader process on a timer wheel)
+def compact_sessions():
+    """Delete expired and logged-out user sessions"""
+    with app.app_context():
+        removed = UserSession.query.filter(
+            (UserSession.expires_at < datetime.utcnow()) | (UserSession.is_active == False)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if removed:
+            logging.info(f"Session compaction: removed {removed} sessions")
+
+job_scheduler = JobScheduler(JOB_LEADER_LOCK_FILE, tick=JOB_SCHEDULER_TICK)
+job_scheduler.register(
+    'log_cleanup',
+    lambda: cleanup_old_logs(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')),
+    interval=24 * 60 * 60, first_run=60
+)
+job_scheduler.register('session_compaction', compact_sessions, interval=60 * 60)
+job_scheduler.register('task_result_purge', purge_expired_results, interval=10 * 60)
+job_scheduler.register('task_metric_purge', purge_old_task_metrics, interval=60 * 60)
+job_scheduler.start()
+
+# Every process feeds its own admission queue to the shared Redis queue the workers read
+start_forwarder()
 
 # Initialize extensions
 db.init_app(app)
@@ -186,6 +204,12 @@ mail = Mail(app)
 # Create database tables
 with app.app_context():
     db.create_all()
+    ensure_collection_versions()
+    # Dynamic table metadata lives outside SQLAlchemy; bring its schema up to date too
+    try:
+        setup_metadata_table()
+    except Exception as e:
+        logging.error(f"Error migrating dynamic table metadata: {e}")
     # Create admin users if not exists
     admin_users = [
         {'username': 'superadmin', 'email': 'superadmin@govconnect.com', 'full_name': 'Super Administrator', 'password': 'super123', 'role': 'super_admin'},
@@ -267,14 +291,17 @@ def login():
         db.session.add(session)
         db.session.commit()
 
-        # Schedule a login tracking task
-        admit({
-            'type': 'user_login',
-            'username': username,
-            'user_id': user.id,
-            'timestamp': datetime.utcnow().isoformat(),
-            'ip': request.remote_addr
-        }, priority=1)
+        # Schedule a login tracking task (tracking is best-effort under overload)
+        try:
+            admit({
+                'type': 'user_login',
+                'username': username,
+                'user_id': user.id,
+                'timestamp': datetime.utcnow().isoformat(),
+                'ip': request.remote_addr
+            }, priority=1, coalesce_key=username)
+        except QueueFull as shed:
+            logging.warning(f"Login tracking task shed: {shed}")
 
         # Create response with cookies
         response = make_response(jsonify({
@@ -352,15 +379,18 @@ def register():
         db.session.add(user)
         db.session.commit()
 
-        # Schedule a registration tracking task
-        admit({
-            'type': 'user_registration',
-            'username': username,
-            'email': email,
-            'user_id': user.id,
-            'timestamp': datetime.utcnow().isoformat(),
-            'ip': request.remote_addr
-        }, priority=2)
+        # Schedule a registration tracking task (tracking is best-effort under overload)
+        try:
+            admit({
+                'type': 'user_registration',
+                'username': username,
+                'email': email,
+                'user_id': user.id,
+                'timestamp': datetime.utcnow().isoformat(),
+                'ip': request.remote_addr
+            }, priority=2)
+        except QueueFull as shed:
+            logging.warning(f"Registration tracking task shed: {shed}")
 
         # Send welcome email
         try:
@@ -609,20 +639,193 @@ def submit_task():
             'taskId': secrets.token_hex(8)
         }
 
+        # Identical submissions from the same user share one queued task
+        coalesce_key = data.get('coalesceKey')
+        if coalesce_key is not None:
+            coalesce_key = f"{user.username}:{coalesce_key}"
+
+        try:
+            priority = int(data.get('priority', 1))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Priority must be an integer'}), 400
+
+        # Only admins may request priorities above the user ceiling
+        if user.role not in ['admin', 'super_admin']:
+            priority = max(1, min(priority, MAX_USER_TASK_PRIORITY))
+
         # Schedule the task with appropriate priority
-        priority = data.get('priority', 1)
-        admit(task_data, priority)
+        try:
+            task_id = admit(task_data, priority, coalesce_key=coalesce_key)
+        except QueueFull as shed:
+            response = make_response(jsonify({
+                'error': 'Task queue is full, please retry later',
+                'retryAfter': shed.retry_after
+            }), 503)
+            response.headers['Retry-After'] = str(shed.retry_after)
+            return response
 
         return jsonify({
             'message': 'Task submitted successfully',
-            'taskId': task_data['taskId'],
-            'status': 'queued'
+            'taskId': task_id,
+            'status': 'queued' if task_id == task_data['taskId'] else 'coalesced'
         }), 202
 
     except Exception as e:
         print(f"Task submission error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/tasks/<task_id>', methods=['GET'])
+def get_task_status(task_id):
+    """Get the status and result of a submitted task"""
+    try:
+        # Verify authentication
+        access_token = request.cookies.get('access_token')
+        if not access_token:
+            auth_header = request.headers.get('Authorization')
+            if auth_header and auth_header.startswith('Bearer '):
+                access_token = auth_header.split(' ')[1]
+
+        if not access_token:
+            return jsonify({'error': 'Authentication required'}), 401
+
+        user = get_user_by_token(access_token)
+        if not user:
+            return jsonify({'error': 'Invalid token'}), 401
+
+        # Apply rate limiting
+        rate_limit(user.username)
+
+        result = get_result(task_id)
+        if not result:
+            return jsonify({'error': 'Task not found or result expired'}), 404
+
+        # Users can only see their own tasks; admins can see all
+        owner = result.get('task', {}).get('username')
+        if owner != user.username and user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Task not found or result expired'}), 404
+
+        return jsonify({'taskId': task_id, **result}), 200
+
+    except Exception as e:
+        print(f"Task status error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/tasks/queue', methods=['GET'])
+@require_auth
+def get_task_queue_stats(user):
+    """Get admission queue depth and shed counts (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        return jsonify(queue_stats()), 200
+
+    except Exception as e:
+        logging.error(f"Error getting task queue stats: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/tasks/metrics', methods=['GET'])
+@require_auth
+def get_task_metrics(user):
+    """Get task pipeline metrics: queue depth and age, wait and service time histograms (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        try:
+            window = max(1, min(int(request.args.get('window', 15)), 24 * 60))
+        except ValueError:
+            return jsonify({'error': 'window must be a number of minutes'}), 400
+
+        # Depth of the queue the workers consume; unavailable if Redis is down
+        try:
+            worker_queue_depth = redis_client.zcard('admission_queue')
+        except Exception:
+            worker_queue_depth = None
+
+        return jsonify({
+            'admissionQueue': queue_stats(),
+            'workerQueueDepth': worker_queue_depth,
+            'windowMinutes': window,
+            'taskTypes': task_metrics_snapshot(window)
+        }), 200
+
+    except Exception as e:
+        logging.error(f"Error getting task metrics: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/tasks/dead-letters', methods=['GET'])
+@require_auth
+def get_dead_letters(user):
+    """List tasks that failed every retry attempt, newest first (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+            offset = max(0, int(request.args.get('offset', 0)))
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+
+        return jsonify({
+            **dead_letter_stats(),
+            'items': list_dead_letters(limit, offset)
+        }), 200
+
+    except Exception as e:
+        logging.error(f"Error listing dead letters: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/tasks/dead-letters/<task_id>/replay', methods=['POST'])
+@require_auth
+def replay_dead_letter_task(user, task_id):
+    """Put a dead-lettered task back on the worker queue (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        if not replay_dead_letter(task_id):
+            return jsonify({'error': 'Dead letter not found'}), 404
+
+        logging.info(f"Dead letter {task_id} replayed by {user.username}")
+        return jsonify({'message': 'Task requeued', 'taskId': task_id}), 202
+
+    except Exception as e:
+        logging.error(f"Error replaying dead letter: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/tasks/dead-letters/<task_id>', methods=['DELETE'])
+@require_auth
+def delete_dead_letter_task(user, task_id):
+    """Discard a dead-lettered task (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        if not delete_dead_letter(task_id):
+            return jsonify({'error': 'Dead letter not found'}), 404
+
+        return jsonify({'message': 'Dead letter deleted'}), 200
+
+    except Exception as e:
+        logging.error(f"Error deleting dead letter: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/jobs', methods=['GET'])
+@require_auth
+def get_scheduled_jobs(user):
+    """Get recurring job run metrics for this process (admin and super_admin only)"""
+    try:
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        return jsonify(job_scheduler.stats()), 200
+
+    except Exception as e:
+        logging.error(f"Error getting scheduled jobs: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/dashboard/metrics', methods=['GET'])
 def get_dashboard_metrics():
     """Get dashboard metrics (requires authentication)"""
@@ -644,14 +847,17 @@ def get_dashboard_metrics():
         # Apply rate limiting
         rate_limit(user.username)
 
-        # Schedule a metrics collection task
-        admit({
-            'type': 'collect_metrics',
-            'username': user.username,
-            'user_id': user.id,
-            'timestamp': datetime.utcnow().isoformat(),
-            'taskId': secrets.token_hex(8)
-        }, priority=3)
+        # Schedule a metrics collection task (one per window, shared by all dashboard loads)
+        try:
+            admit({
+                'type': 'collect_metrics',
+                'username': user.username,
+                'user_id': user.id,
+                'timestamp': datetime.utcnow().isoformat(),
+                'taskId': secrets.token_hex(8)
+            }, priority=3, coalesce_key='dashboard')
+        except QueueFull as shed:
+            logging.warning(f"Metrics collection task shed: {shed}")
 
         # Return mock dashboard data (in production, this would come from processed tasks)
         return jsonify({
@@ -685,11 +891,15 @@ def get_dashboard_metrics():
 def get_hospitals():
     """Get all hospitals (public access for appointment booking)"""
     try:
-        hospitals = Hospital.query.all()
-        return jsonify({
-            'hospitals': [hospital.to_dict() for hospital in hospitals]
-        }), 200
+        def build():
+            hospitals, page = paginate(Hospital.query, [(Hospital.hospital_id, False)], request.args)
+            return page_response({
+                'hospitals': [hospital.to_dict() for hospital in hospitals]
+            }, page)
+        return conditional_list(Hospital, build)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get hospitals error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -939,11 +1149,15 @@ def get_farmers():
         # Apply rate limiting
         rate_limit(user.username)
 
-        farmers = Farmer.query.all()
-        return jsonify({
-            'farmers': [farmer.to_dict() for farmer in farmers]
-        }), 200
+        def build():
+            farmers, page = paginate(Farmer.query, [(Farmer.farmer_name, False)], request.args)
+            return page_response({
+                'farmers': [farmer.to_dict() for farmer in farmers]
+            }, page)
+        return conditional_list(Farmer, build)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get farmers error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1089,11 +1303,15 @@ def get_doctors():
         # Apply rate limiting
         rate_limit(user.username)
 
-        doctors = Doctor.query.all()
-        return jsonify({
-            'doctors': [doctor.to_dict() for doctor in doctors]
-        }), 200
+        def build():
+            doctors, page = paginate(Doctor.query, [(Doctor.dr_name, False)], request.args)
+            return page_response({
+                'doctors': [doctor.to_dict() for doctor in doctors]
+            }, page)
+        return conditional_list(Doctor, build)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get doctors error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1266,11 +1484,17 @@ def get_appointments():
         # Apply rate limiting
         rate_limit(user.username)
 
-        appointments = Appointment.query.order_by(Appointment.appointment_date.desc(), Appointment.appointment_time.desc()).all()
-        return jsonify({
+        appointments, page = paginate(Appointment.query, [
+            (Appointment.appointment_date, True),
+            (Appointment.appointment_time, True),
+            (Appointment.id, True)
+        ], request.args)
+        return page_response({
             'appointments': [appointment.to_dict() for appointment in appointments]
-        }), 200
+        }, page)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get appointments error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1450,15 +1674,18 @@ def get_my_appointments():
         if not email:
             return jsonify({'error': 'Email parameter required'}), 400
 
-        appointments = Appointment.query.filter_by(patient_email=email).order_by(
-            Appointment.appointment_date.desc(), 
-            Appointment.appointment_time.desc()
-        ).all()
+        appointments, page = paginate(Appointment.query.filter_by(patient_email=email), [
+            (Appointment.appointment_date, True),
+            (Appointment.appointment_time, True),
+            (Appointment.id, True)
+        ], request.args)
         
-        return jsonify({
+        return page_response({
             'appointments': [appointment.to_dict() for appointment in appointments]
-        }), 200
+        }, page)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get my appointments error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1477,7 +1704,7 @@ def health_check():
 def get_all_users(user):
     """Get all users (super admin only)"""
     try:
-        users = User.query.all()
+        users, page = paginate(User.query, [(User.id, False)], request.args)
         users_data = []
         for u in users:
             users_data.append({
@@ -1493,8 +1720,10 @@ def get_all_users(user):
             })
         
         logging.info(f"Super admin {user.username} accessed user list")
-        return jsonify({'users': users_data}), 200
+        return page_response({'users': users_data}, page)
     
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logging.error(f"Error getting users: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1679,8 +1908,7 @@ def delete_user(user, user_id):
 def get_services(user):
     """Get all services (super_admin only)"""
     try:
-        services = Service.query.all()
-        return jsonify([service.to_dict() for service in services]), 200
+        return conditional_list(Service, lambda: jsonify([service.to_dict() for service in Service.query.all()]))
     except Exception as e:
         logging.error(f"Error fetching services: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1936,11 +2164,13 @@ def create_dynamic_table(user):
         fields = data.get('fields', [])
         data_types = data.get('data_types', [])
         show_ui = data.get('show_ui', [])
+        storage = data.get('storage', 'table')
+        filterable = data.get('filterable')
         
         if not table_name or not fields or not data_types or not show_ui:
             return jsonify({'error': 'table_name, fields, data_types, and show_ui are required'}), 400
         
-        create_dynamic_database(table_name, fields, data_types, show_ui)
+        create_dynamic_database(table_name, fields, data_types, show_ui, storage, filterable)
         
         return jsonify({
             'message': f'Dynamic table "{table_name}" created successfully',
@@ -1962,24 +2192,8 @@ def get_dynamic_tables(user):
         if user.role not in ['admin', 'super_admin']:
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
         
-        # Import here to avoid circular imports
-        import mysql.connector as con
-        connector = con.connect(
-            host='localhost',
-            user='root',
-            password='Soul#13211993',
-            database='govconnect'
-        )
-        cursor = connector.cursor(dictionary=True)
-        
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
-        
-        # Filter for dynamic tables (those with metadata)
-        cursor.execute("SELECT DISTINCT table_name FROM dynamic_table_meta")
-        dynamic_tables = [row['table_name'] for row in cursor.fetchall()]
-        
-        connector.close()
+        # Dynamic tables are those with metadata
+        dynamic_tables = schema_cache.get_tables()
         
         return jsonify({'tables': dynamic_tables}), 200
     
@@ -1996,23 +2210,7 @@ def get_table_metadata(user, table_name):
         if user.role not in ['admin', 'super_admin']:
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
         
-        import mysql.connector as con
-        connector = con.connect(
-            host='localhost',
-            user='root',
-            password='Soul#13211993',
-            database='govconnect'
-        )
-        cursor = connector.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT field_name, data_type, show_ui 
-            FROM dynamic_table_meta 
-            WHERE table_name = %s
-        """, (table_name,))
-        
-        metadata = cursor.fetchall()
-        connector.close()
+        metadata = schema_cache.get_fields(table_name)
         
         if not metadata:
             return jsonify({'error': 'Table not found or no metadata available'}), 404
@@ -2051,6 +2249,36 @@ def insert_dynamic_table_data(user, table_name):
         logging.error(f"Error inserting data: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/admin/dynamic/tables/<table_name>/data/bulk', methods=['POST'])
+@require_auth
+def bulk_insert_dynamic_table_data(user, table_name):
+    """Insert many rows into a dynamic table from a JSON array or an NDJSON body"""
+    try:
+        # Only admin and super_admin can insert data
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            # Parsed line by line as the body streams in
+            rows = parse_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({'error': 'Request body must be a JSON array of rows or NDJSON'}), 400
+            rows = enumerate(data, 1)
+
+        result = bulk_insert_dynamic_data(table_name, rows)
+        logging.info(f"Bulk insert into {table_name} by {user.username}: "
+                     f"{result['inserted']} inserted, {result['failed']} failed")
+
+        return jsonify({'table_name': table_name, **result}), 201 if not result['failed'] else 207
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error bulk inserting data: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/admin/dynamic/tables/<table_name>/data', methods=['GET'])
 @require_auth
 def get_dynamic_table_data(user, table_name):
@@ -2061,20 +2289,177 @@ def get_dynamic_table_data(user, table_name):
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
         
         ui_only = request.args.get('ui_only', 'true').lower() == 'true'
-        data = fetch_dynamic_data(table_name, ui_only)
-        
-        return jsonify({
+        body = {
             'table_name': table_name,
-            'data': data,
             'ui_only': ui_only
-        }), 200
+        }
+
+        # Delta sync: only rows written and ids deleted since the cursor
+        since = request.args.get('since')
+        if since:
+            body['data'], body['deleted'], body['syncCursor'] = sync_dynamic_data(table_name, since, ui_only)
+            return jsonify(body), 200
+
+        # Filters, sort, limit or cursor switch to a paginated query; other
+        # parameters (cache busters, tracking) are ignored
+        args = query_args(table_name, request.args.to_dict())
+        if args:
+            body['data'], next_cursor = query_dynamic_data(table_name, args, ui_only)
+            page = {'nextCursor': next_cursor, 'limit': parse_limit(request.args.get('limit'))}
+            return page_response(body, page)
+
+        body['data'], body['syncCursor'] = fetch_dynamic_data(table_name, ui_only, with_sync_cursor=True)
+        return jsonify(body), 200
     
+    except SyncExpired as e:
+        return jsonify({'error': str(e)}), 410
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         logging.error(f"Error fetching data: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/admin/dynamic/tables/<table_name>/aggregate', methods=['GET'])
+@require_auth
+def aggregate_dynamic_table_data(user, table_name):
+    """Grouped counts, sums, averages, minimums and maximums over a dynamic table"""
+    try:
+        # Only admin and super_admin can view data
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        result = aggregate_dynamic_data(table_name, request.args.to_dict())
+
+        return jsonify({
+            'table_name': table_name,
+            **result
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error aggregating data: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/dynamic/tables/<table_name>/indexes', methods=['GET'])
+@require_auth
+def get_dynamic_table_indexes(user, table_name):
+    """List the indexes on a dynamic table"""
+    try:
+        # Only admin and super_admin can view indexes
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        return jsonify({
+            'table_name': table_name,
+            'indexes': list_dynamic_indexes(table_name)
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error listing indexes: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/dynamic/tables/<table_name>/indexes', methods=['POST'])
+@require_auth
+def create_dynamic_table_index(user, table_name):
+    """Add an index on one or more fields of a dynamic table"""
+    try:
+        # Only super_admin can change table structure
+        if user.role != 'super_admin':
+            return jsonify({'error': 'Access denied. Super admin privileges required.'}), 403
+
+        data = request.get_json() or {}
+        fields = data.get('fields')
+        if not isinstance(fields, list) or not fields:
+            return jsonify({'error': 'fields must be a non-empty list'}), 400
+
+        index_name = create_dynamic_index(table_name, fields)
+        logging.info(f"Index {index_name} created on {table_name} by {user.username}")
+
+        return jsonify({
+            'message': f'Index "{index_name}" created on "{table_name}"',
+            'index_name': index_name
+        }), 201
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error creating index: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/dynamic/tables/<table_name>/indexes/<index_name>', methods=['DELETE'])
+@require_auth
+def delete_dynamic_table_index(user, table_name, index_name):
+    """Drop an index created through the index API"""
+    try:
+        # Only super_admin can change table structure
+        if user.role != 'super_admin':
+            return jsonify({'error': 'Access denied. Super admin privileges required.'}), 403
+
+        drop_dynamic_index(table_name, index_name)
+        logging.info(f"Index {index_name} dropped from {table_name} by {user.username}")
+
+        return jsonify({
+            'message': f'Index "{index_name}" dropped from "{table_name}"'
+        }), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error dropping index: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/admin/dynamic/tables/<table_name>/export', methods=['GET'])
+@require_auth
+def export_dynamic_table_data(user, table_name):
+    """Stream every row of a dynamic table as NDJSON (default) or CSV"""
+    try:
+        # Only admin and super_admin can view data
+        if user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+        ui_only = request.args.get('ui_only', 'true').lower() == 'true'
+        columns, chunks = export_dynamic_data(table_name, ui_only)
+
+        def to_text(value):
+            return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+        def generate_ndjson():
+            for rows in chunks:
+                yield ''.join(json.dumps(dict(zip(columns, row)), default=to_text) + '\n' for row in rows)
+
+        def generate_csv():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+
+        logging.info(f"Export of {table_name} ({export_format}) started by {user.username}")
+        if export_format == 'csv':
+            response = Response(generate_csv(), mimetype='text/csv')
+        else:
+            response = Response(generate_ndjson(), mimetype='application/x-ndjson')
+        response.headers['Content-Disposition'] = f'attachment; filename="{table_name}.{export_format}"'
+        return response
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error exporting data: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/admin/dynamic/tables/<table_name>/data/<int:record_id>', methods=['PUT'])
 @require_auth
 def update_dynamic_table_data(user, table_name, record_id):
@@ -2170,7 +2555,6 @@ def delete_dynamic_field(user, table_name, field_name):
         return jsonify({'error': 'Internal server error'}), 500
 
 # Dashboard Field Management (using makeSections.py functionality)
-dashboard_configs = []
 
 @app.route('/api/fields', methods=['POST'])
 @require_auth
@@ -2210,24 +2594,26 @@ def add_dashboard_field(user):
             create_dynamic_database(table_name, fields, data_types, show_ui)
         
         # Store configuration
-        new_field = {
-            "id": len(dashboard_configs) + 1,
-            "name": data.get('fieldName'),
-            "category": data.get('fieldType'),
-            "db_strategy": data.get('dbType'),
-            "schema": data.get('inputs'),
-            "table_name": table_name,
-            "created_at": datetime.utcnow().isoformat()
-        }
+        new_field = DashboardField(
+            name=data.get('fieldName'),
+            category=data.get('fieldType'),
+            db_strategy=data.get('dbType'),
+            schema=data.get('inputs'),
+            table_name=table_name,
+            created_by=user.id
+        )
         
-        dashboard_configs.append(new_field)
+        db.session.add(new_field)
+        db.session.commit()
+        dashboard_field_cache.invalidate()
         
         return jsonify({
             "message": "Dashboard field added successfully!",
-            "data": new_field
+            "data": new_field.to_dict()
         }), 201
     
     except Exception as e:
+        db.session.rollback()
         logging.error(f"Error adding dashboard field: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
@@ -2236,7 +2622,14 @@ def add_dashboard_field(user):
 def get_dashboard_fields(user):
     """Get all dashboard field configurations"""
     try:
-        return jsonify({"fields": dashboard_configs}), 200
+        # Served from the per-process cache; unchanged lists get a 304
+        body, etag = dashboard_field_cache.get(
+            lambda: [field.to_dict() for field in DashboardField.query.order_by(DashboardField.id).all()]
+        )
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     except Exception as e:
         logging.error(f"Error getting dashboard fields: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -2300,9 +2693,14 @@ def get_pages(user):
         if user.role not in ['admin', 'super_admin']:
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
 
-        pages = Page.query.filter_by(is_active=True).order_by(Page.created_at.desc()).all()
-        return jsonify([page.to_dict() for page in pages]), 200
+        def build():
+            pages, page_info = paginate(Page.query.filter_by(is_active=True),
+                                        [(Page.created_at, True), (Page.id, True)], request.args)
+            return page_response([page.to_dict() for page in pages], page_info)
+        return conditional_list(Page, build)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logging.error(f"Error getting pages: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -2423,12 +2821,16 @@ def get_alerts():
         user_id = request.remote_addr
         rate_limit(user_id)
 
-        alerts = Alert.query.filter_by(is_active=True).order_by(Alert.created_at.desc()).all()
-
-        return jsonify({
-            'alerts': [alert.to_dict() for alert in alerts]
-        }), 200
+        def build():
+            alerts, page = paginate(Alert.query.filter_by(is_active=True),
+                                    [(Alert.created_at, True), (Alert.id, True)], request.args)
+            return page_response({
+                'alerts': [alert.to_dict() for alert in alerts]
+            }, page)
+        return conditional_list(Alert, build)
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logging.error(f"Error getting alerts: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -2740,6 +3142,13 @@ if __name__ == '__main__':
     print("POST /auth/refresh")
     print("POST /auth/logout")
     print("POST /tasks/submit")
+    print("GET /tasks/<task_id>")
+    print("GET /admin/tasks/queue")
+    print("GET /admin/tasks/metrics")
+    print("GET /admin/tasks/dead-letters")
+    print("POST /admin/tasks/dead-letters/<task_id>/replay")
+    print("DELETE /admin/tasks/dead-letters/<task_id>")
+    print("GET /admin/jobs")
     print("GET /healthcare/hospitals")
     print("POST /healthcare/hospitals")
     print("PUT /healthcare/hospitals/<hospital_id>")
@@ -2778,7 +3187,13 @@ if __name__ == '__main__':
     print("GET /admin/dynamic/tables")
     print("GET /admin/dynamic/tables/<table_name>/metadata")
     print("POST /admin/dynamic/tables/<table_name>/data")
+    print("POST /admin/dynamic/tables/<table_name>/data/bulk")
     print("GET /admin/dynamic/tables/<table_name>/data")
+    print("GET /admin/dynamic/tables/<table_name>/export")
+    print("GET /admin/dynamic/tables/<table_name>/aggregate")
+    print("GET /admin/dynamic/tables/<table_name>/indexes")
+    print("POST /admin/dynamic/tables/<table_name>/indexes")
+    print("DELETE /admin/dynamic/tables/<table_name>/indexes/<index_name>")
     print("PUT /admin/dynamic/tables/<table_name>/data/<record_id>")
     print("DELETE /admin/dynamic/tables/<table_name>/data/<record_id>")
     print("DELETE /admin/dynamic/tables/<table_name>")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Simulation benchmark for the admission queue's fair scheduling.
+One adversarial user floods the queue with max-priority tasks at three times
+worker capacity while regular users submit priority-1 tasks. Compares wait
+times for the regular users under plain priority ordering and under fair
+queuing with priority aging.
+"""
+
+import random
+from scheduler import FairQueue, QueueFull
+
+SERVICE_RATE = 100        # tasks the workers complete per simulated second
+TICK = 0.01               # simulated seconds per step
+DURATION = 120            # simulated seconds
+ADVERSARY_RATE = 300      # adversary tasks per second
+ADVERSARY_PRIORITY = 5
+REGULAR_USERS = 20
+REGULAR_RATE = 50         # total regular tasks per second
+CAPACITY = 5000
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def simulate(fair):
+    random.seed(42)
+    clock = SimClock()
+    if fair:
+        queue = FairQueue(capacity=CAPACITY, clock=clock)
+    else:
+        # Strict priority, FIFO within a priority, no per-user limit
+        queue = FairQueue(capacity=CAPACITY, priority_capacity=CAPACITY, tenant_capacity=CAPACITY,
+                          aging_rate=0.0, share_cost=0.0, clock=clock)
+
+    waits = {'adversary': [], 'regular': []}
+    shed = {'adversary': 0, 'regular': 0}
+    served_budget = 0.0
+    seq = 0
+
+    steps = int(DURATION / TICK)
+    for _ in range(steps):
+        clock.now += TICK
+
+        arrivals = [('adversary', ADVERSARY_PRIORITY)] * int(ADVERSARY_RATE * TICK)
+        for _user in range(REGULAR_USERS):
+            if random.random() < REGULAR_RATE * TICK / REGULAR_USERS:
+                arrivals.append((f'user{_user}', 1))
+
+        for tenant, priority in arrivals:
+            seq += 1
+            try:
+                victims = queue.push(str(seq), None, None, tenant, priority)
+            except QueueFull:
+                victims = [tenant]
+            for victim in victims:
+                victim_tenant = victim if isinstance(victim, str) else victim.tenant
+                shed['adversary' if victim_tenant == 'adversary' else 'regular'] += 1
+
+        served_budget += SERVICE_RATE * TICK
+        while served_budget >= 1:
+            served_budget -= 1
+            entry = queue.pop()
+            if entry is None:
+                break
+            kind = 'adversary' if entry.tenant == 'adversary' else 'regular'
+            waits[kind].append(clock.now - entry.enqueued_at)
+
+    # Tasks still queued have waited at least until the end of the run
+    starved = 0
+    while True:
+        entry = queue.pop()
+        if entry is None:
+            break
+        if entry.tenant != 'adversary':
+            starved += 1
+            waits['regular'].append(clock.now - entry.enqueued_at)
+
+    return waits, shed, starved
+
+def report(label, waits, shed, starved):
+    regular = waits['regular']
+    print(f"{label}")
+    if regular:
+        print(f"  regular users : p50={percentile(regular, 50):7.2f}s  p99={percentile(regular, 99):7.2f}s  "
+              f"max={max(regular):7.2f}s  served={len(regular) - starved}  shed={shed['regular']}  "
+              f"still queued={starved}")
+    else:
+        print(f"  regular users : none served  shed={shed['regular']}")
+    adversary = waits['adversary']
+    print(f"  adversary     : p50={percentile(adversary, 50):7.2f}s  p99={percentile(adversary, 99):7.2f}s  "
+          f"served={len(adversary)}  shed={shed['adversary']}")
+
+if __name__ == "__main__":
+    print(f"Simulating {DURATION}s: adversary {ADVERSARY_RATE}/s at priority {ADVERSARY_PRIORITY}, "
+          f"{REGULAR_USERS} users {REGULAR_RATE}/s at priority 1, workers {SERVICE_RATE}/s\n")
+    report("Strict priority ordering", *simulate(fair=False))
+    report("Fair queuing with priority aging", *simulate(fair=True))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the composite indexes on appointments, alerts and doctors.
+Loads 1M appointments (plus alerts and doctors) into an in-memory SQLite
+database and times the hot queries before and after creating the indexes
+declared in models.py.
+"""
+
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from models import Appointment, Alert, Doctor
+
+APPOINTMENTS = 1000000
+ALERTS = 100000
+DOCTORS = 50000
+HOSPITALS = 2000
+PATIENTS = 200000
+REPEAT = 200
+PAGE_SIZE = 50
+
+def load(conn):
+    random.seed(7)
+    for model in (Appointment, Alert, Doctor):
+        # Foreign keys point at users, which is not loaded
+        conn.execute(str(CreateTable(model.__table__).compile(dialect=sqlite.dialect())))
+
+    start = date(2024, 1, 1)
+    statuses = ['scheduled', 'confirmed', 'completed', 'cancelled']
+    conn.executemany(
+        "INSERT INTO appointments (id, patient_name, patient_email, patient_phone, hospital_id, department, "
+        "appointment_date, appointment_time, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, f"Patient {i}", f"patient{random.randrange(PATIENTS)}@example.com", '9876543210',
+          f"H{random.randrange(HOSPITALS):05d}", 'General',
+          (start + timedelta(days=random.randrange(730))).isoformat(),
+          f"{random.randrange(8, 18):02d}:{random.choice(['00', '30'])}:00.000000",
+          random.choice(statuses), '2024-01-01 00:00:00') for i in range(1, APPOINTMENTS + 1))
+    )
+    conn.executemany(
+        "INSERT INTO alerts (id, type, message, severity, created_by, created_at, is_active) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, 'System', f"Alert {i}", 'LOW', 1, f"2024-01-01 00:00:{i % 60:02d}.{i:06d}", int(random.random() < 0.05))
+         for i in range(1, ALERTS + 1))
+    )
+    conn.executemany(
+        "INSERT INTO doctors (dr_name, hospital_id, gender, time) VALUES (?, ?, ?, ?)",
+        ((f"Dr {i}", f"H{random.randrange(HOSPITALS):05d}", 'F', '9-5') for i in range(DOCTORS))
+    )
+    conn.commit()
+
+def queries():
+    """(label, sql, params factory) for each hot query path"""
+    rnd = random.Random(11)
+    return [
+        ('create_appointment slot check',
+         "SELECT id FROM appointments WHERE hospital_id = ? AND appointment_date = ? AND appointment_time = ? "
+         "AND status = ? LIMIT 1",
+         lambda: (f"H{rnd.randrange(HOSPITALS):05d}", (date(2024, 1, 1) + timedelta(days=rnd.randrange(730))).isoformat(),
+                  '10:30:00.000000', 'scheduled')),
+        ('get_my_appointments',
+         "SELECT * FROM appointments WHERE patient_email = ? "
+         "ORDER BY appointment_date DESC, appointment_time DESC, id DESC LIMIT ?",
+         lambda: (f"patient{rnd.randrange(PATIENTS)}@example.com", PAGE_SIZE)),
+        ('get_appointments (first page)',
+         "SELECT * FROM appointments ORDER BY appointment_date DESC, appointment_time DESC, id DESC LIMIT ?",
+         lambda: (PAGE_SIZE,)),
+        ('get_alerts (first page)',
+         "SELECT * FROM alerts WHERE is_active = 1 ORDER BY created_at DESC, id DESC LIMIT ?",
+         lambda: (PAGE_SIZE,)),
+        ('delete_hospital doctor count',
+         "SELECT count(*) FROM doctors WHERE hospital_id = ?",
+         lambda: (f"H{rnd.randrange(HOSPITALS):05d}",)),
+    ]
+
+def run(conn):
+    timings = {}
+    for label, sql, params in queries():
+        runs = 0
+        started = time.perf_counter()
+        while runs < REPEAT:
+            conn.execute(sql, params()).fetchall()
+            runs += 1
+            # Full scans are slow; a couple of seconds of them is enough for an average
+            if time.perf_counter() - started > 2:
+                break
+        timings[label] = (time.perf_counter() - started) / runs * 1000
+    return timings
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(':memory:')
+    print(f"Loading {APPOINTMENTS:,} appointments, {ALERTS:,} alerts, {DOCTORS:,} doctors...")
+    load(conn)
+
+    before = run(conn)
+    started = time.perf_counter()
+    for model in (Appointment, Alert, Doctor):
+        for index in model.__table__.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+    print(f"Created indexes in {time.perf_counter() - started:.1f}s\n")
+    after = run(conn)
+
+    print(f"{'query':34} {'no index (ms)':>14} {'indexed (ms)':>13} {'speedup':>9}")
+    for label in before:
+        print(f"{label:34} {before[label]:14.3f} {after[label]:13.3f} {before[label] / after[label]:8.0f}x")
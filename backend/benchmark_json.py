@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for API response encoding.
+Encodes 10k appointment-shaped rows the way jsonify did before
+FastJSONProvider (isoformat() in to_dict, stdlib encoder with sorted keys)
+and with the provider's stdlib and orjson encoders, which take the
+datetime objects directly.
+"""
+
+import json
+import time
+from datetime import date, datetime, timedelta
+from json_provider import dumps_stdlib, dumps_orjson, orjson
+
+ROWS = 10000
+REPEAT = 20
+
+def appointments():
+    start = datetime(2025, 1, 1, 9, 30)
+    for i in range(ROWS):
+        created = start + timedelta(minutes=i)
+        yield {
+            'id': i,
+            'patientName': f"Patient {i}",
+            'patientEmail': f"patient{i}@example.com",
+            'patientPhone': '9876543210',
+            'hospitalId': f"H{i % 2000:05d}",
+            'department': 'General',
+            'appointmentDate': date(2025, 3, 1) + timedelta(days=i % 90),
+            'appointmentTime': created.time(),
+            'status': 'scheduled',
+            'notes': None,
+            'createdAt': created,
+            'updatedAt': created
+        }
+
+def with_isoformat(row):
+    return {k: v.isoformat() if hasattr(v, 'isoformat') else v for k, v in row.items()}
+
+def before(rows):
+    # to_dict() calling isoformat(), then Flask's default provider settings
+    return json.dumps({'appointments': [with_isoformat(r) for r in rows]},
+                      sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def rate(func, rows):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        body = func(rows)
+    return REPEAT / (time.perf_counter() - started), len(body)
+
+if __name__ == "__main__":
+    rows = list(appointments())
+    encoders = {
+        'before': before,
+        'stdlib': lambda rows: dumps_stdlib({'appointments': rows})
+    }
+    if orjson:
+        encoders['orjson'] = lambda rows: dumps_orjson({'appointments': rows})
+    else:
+        print("orjson is not installed; skipping it\n")
+
+    assert json.loads(encoders['stdlib'](rows)) == json.loads(before(rows))
+    print(f"{ROWS} rows, {REPEAT} responses each\n")
+    print(f"{'encoder':8} {'responses/s':>12} {'rows/s':>12} {'bytes':>10}")
+    for name, func in encoders.items():
+        per_second, size = rate(func, rows)
+        print(f"{name:8} {per_second:12,.1f} {per_second * ROWS:12,.0f} {size:10,}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the prepared statement cache used by dynamicDatabase.
+Creates a scratch dynamic table on the configured MySQL database and times
+single-row inserts and whole-table fetches, sending the same SQL as plain
+text through db_cursor() and as cached server-side prepared statements
+through prepared_cursor(). The scratch table is dropped afterwards.
+"""
+
+import secrets
+import time
+from datetime import date, timedelta
+from db_pool import db_cursor, prepared_cursor
+from dynamicDatabase import setup_metadata_table, create_dynamic_database, delete_dynamic_table, _statement
+
+INSERTS = 5000
+FETCHES = 2000
+FETCH_ROWS = 100
+COLUMNS = ("name", "age", "score", "visit_date")
+
+def rows(count):
+    start = date(2025, 1, 1)
+    for i in range(count):
+        yield [f"Patient {i}", 20 + i % 60, i * 0.25, (start + timedelta(days=i % 365)).isoformat()]
+
+def text_insert(sql, values):
+    with db_cursor() as cursor:
+        cursor.execute(sql, values)
+
+def prepared_insert(sql, values):
+    with prepared_cursor(sql) as cursor:
+        cursor.execute(sql, values)
+
+def text_fetch(sql):
+    with db_cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+def prepared_fetch(sql):
+    with prepared_cursor(sql) as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+def rate(count, func):
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+    table = f"bench_prepared_{secrets.token_hex(4)}"
+    setup_metadata_table()
+    create_dynamic_database(table, list(COLUMNS), ["string", "int", "float", "date"], [True] * len(COLUMNS))
+    try:
+        insert_sql = _statement("insert", table, COLUMNS)
+        select_sql = _statement("select", table, COLUMNS)
+        for values in rows(FETCH_ROWS):
+            text_insert(insert_sql, values)
+
+        print(f"{FETCHES} fetches of {FETCH_ROWS} rows, {INSERTS} single-row inserts\n")
+        print(f"{'mode':10} {'fetch/s':>10} {'insert/s':>10}")
+        for mode, insert, fetch in (("text", text_insert, text_fetch),
+                                    ("prepared", prepared_insert, prepared_fetch)):
+            fetch_rate = rate(FETCHES, lambda: fetch(select_sql))
+            pending = rows(INSERTS)
+            insert_rate = rate(INSERTS, lambda: insert(insert_sql, next(pending)))
+            print(f"{mode:10} {fetch_rate:10,.0f} {insert_rate:10,.0f}")
+    finally:
+        delete_dynamic_table(table)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the admission queue task encoding.
+Compares JSON and the binary task codec on encode/decode throughput and
+payload size for representative tasks, and reports Redis memory per
+million queued tasks. Memory is measured on a live Redis when one is
+reachable, otherwise estimated from payload sizes.
+"""
+
+import json
+import secrets
+import time
+from datetime import datetime
+from task_codec import encode, decode
+
+ITERATIONS = 200000
+REDIS_SAMPLE = 100000
+SCALE = 1000000
+
+def sample_tasks():
+    now = time.time()
+    return [
+        {
+            'type': 'user_login',
+            'username': 'demo_user1',
+            'user_id': 11,
+            'timestamp': datetime.utcnow().isoformat(),
+            'ip': '192.168.1.23',
+            'taskId': secrets.token_hex(8),
+            'enqueued_at': now
+        },
+        {
+            'type': 'collect_metrics',
+            'username': 'healthadmin',
+            'user_id': 3,
+            'timestamp': datetime.utcnow().isoformat(),
+            'taskId': secrets.token_hex(8),
+            'enqueued_at': now
+        },
+        {
+            'type': 'appointment_booking',
+            'username': 'farmer1',
+            'user_id': 12,
+            'data': {'doctorId': 4, 'slot': '2025-03-01T10:30'},
+            'timestamp': datetime.utcnow().isoformat(),
+            'taskId': secrets.token_hex(8),
+            'enqueued_at': now
+        }
+    ]
+
+def throughput(func, items):
+    started = time.perf_counter()
+    for i in range(ITERATIONS):
+        func(items[i % len(items)])
+    return ITERATIONS / (time.perf_counter() - started)
+
+def redis_memory(payloads):
+    """Bytes of Redis memory per queued task, or None if Redis is unavailable"""
+    try:
+        from redis_client import redis_binary_client as client
+        client.ping()
+    except Exception:
+        return None
+    key = f"benchmark:codec:{secrets.token_hex(4)}"
+    try:
+        # Unique members, like real tasks with distinct taskIds
+        pipe = client.pipeline(transaction=False)
+        for i in range(REDIS_SAMPLE):
+            payload = payloads[i % len(payloads)]
+            pipe.zadd(key, {payload + i.to_bytes(4, 'little'): float(i)})
+            if i % 10000 == 9999:
+                pipe.execute()
+        pipe.execute()
+        return client.memory_usage(key, samples=0) / REDIS_SAMPLE
+    finally:
+        client.delete(key)
+
+if __name__ == "__main__":
+    tasks = sample_tasks()
+    codecs = {
+        'json': (lambda t: json.dumps(t).encode('utf-8'), json.loads),
+        'binary': (encode, decode)
+    }
+
+    print(f"{ITERATIONS} iterations over {len(tasks)} representative tasks\n")
+    print(f"{'codec':8} {'avg bytes':>10} {'encode/s':>12} {'decode/s':>12} {'MB per 1M queued':>18}")
+    for name, (enc, dec) in codecs.items():
+        payloads = [enc(t) for t in tasks]
+        assert all(dec(p) == t for p, t in zip(payloads, tasks))
+        avg_bytes = sum(len(p) for p in payloads) / len(payloads)
+        per_task = redis_memory(payloads)
+        if per_task is None:
+            # Payload plus typical skiplist/dict overhead per sorted set member
+            memory = f"~{(avg_bytes + 4 + 80) * SCALE / 1e6:.0f} (est.)"
+        else:
+            memory = f"{per_task * SCALE / 1e6:.0f}"
+        print(f"{name:8} {avg_bytes:10.1f} {throughput(enc, tasks):12,.0f} "
+              f"{throughput(dec, payloads):12,.0f} {memory:>18}")
@@ -0,0 +1,52 @@
+"""
+Change counters for list endpoints that answer conditional GETs.
+
+Each tracked table has a row in collection_versions. Any flush that inserts,
+changes or deletes a row of a tracked model bumps that counter in the same
+transaction, so readers never see new rows with an old version. A list
+endpoint reads the counter with one primary-key lookup, derives its ETag
+from it, and answers If-None-Match with 304 before loading any rows.
+There is no Last-Modified: HTTP dates have one-second resolution, so two
+writes in the same second would leave If-Modified-Since clients stale.
+
+The counting itself is an after_flush listener in models.py, so scripts
+that only import models bump it too. Bulk Query.update()/delete() and raw
+SQL bypass the ORM and do not bump the counter; call bump_collections()
+after them.
+"""
+
+import hashlib
+from flask import make_response, request
+from werkzeug.http import is_resource_modified
+from models import db, CollectionVersion, TRACKED_COLLECTIONS
+
+def ensure_collection_versions():
+    """Create the counter rows for tracked tables that do not have one yet"""
+    existing = {row.name for row in CollectionVersion.query.all()}
+    for name in TRACKED_COLLECTIONS - existing:
+        db.session.add(CollectionVersion(name=name, version=0))
+    db.session.commit()
+
+def conditional_list(model, build):
+    """Response for a list endpoint over model's table, validated by its change counter.
+
+    build() returns the usual response (anything make_response accepts). It
+    is not called when the client's copy is current; the response is then an
+    empty 304. The ETag also covers the query string, so each page and
+    filter has its own.
+    """
+    counter = db.session.get(CollectionVersion, model.__tablename__)
+    if counter is None:
+        return build()
+
+    key = f"{counter.name}:{counter.version}:{request.query_string.decode('latin-1')}"
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    if is_resource_modified(request.environ, etag=etag):
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    else:
+        response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -14,6 +14,25 @@ MYSQL_PASSWORD = 'Soul#13211993'
 MYSQL_DB = 'govconnect'
 MYSQL_PORT = 3306
 
+# Connection pool for raw mysql.connector access (dynamic tables)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))  # seconds to wait for a free connection
+DB_POOL_PING_INTERVAL = 30  # ping connections idle longer than this before reuse
+DB_POOL_RECYCLE = 3600  # replace connections older than this (below MySQL wait_timeout)
+DB_STATEMENT_CACHE_SIZE = 64  # prepared statements kept per pooled connection
+DYNAMIC_SCHEMA_VERSION_FILE = os.getenv('DYNAMIC_SCHEMA_VERSION_FILE', 'logs/dynamic_schema.version')  # bumped on dynamic table DDL
+DASHBOARD_FIELDS_VERSION_FILE = os.getenv('DASHBOARD_FIELDS_VERSION_FILE', 'logs/dashboard_fields.version')  # bumped on dashboard field writes
+DYNAMIC_BULK_BATCH_SIZE = int(os.getenv('DYNAMIC_BULK_BATCH_SIZE', 500))  # rows per transaction in bulk inserts
+DYNAMIC_BULK_MAX_ERRORS = 1000  # per-row errors reported by one bulk insert
+DYNAMIC_FIELD_DROP_BATCH = 1000  # documents stripped per transaction when a document table field is dropped
+DYNAMIC_EXPORT_CHUNK_SIZE = 1000  # rows fetched and written per chunk when streaming an export
+DYNAMIC_AGGREGATE_CACHE_TTL = int(os.getenv('DYNAMIC_AGGREGATE_CACHE_TTL', 30))  # seconds, 0 disables
+DYNAMIC_AGGREGATE_CACHE_SIZE = int(os.getenv('DYNAMIC_AGGREGATE_CACHE_SIZE', 256))  # cached results per process
+DYNAMIC_AGGREGATE_MAX_GROUPS = 1000  # buckets returned by one aggregation
+DYNAMIC_SYNC_OVERLAP = 5  # seconds each sync cursor is set back to cover in-flight writes
+DYNAMIC_SYNC_MAX_CHANGES = 10000  # larger deltas make the client refetch the full table
+DYNAMIC_TOMBSTONE_RETENTION = int(os.getenv('DYNAMIC_TOMBSTONE_RETENTION', 7 * 24 * 60 * 60))  # seconds
+
 # SQLAlchemy Configuration
 SQLALCHEMY_DATABASE_URI = f'mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}'
 SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -23,6 +42,45 @@ SQLALCHEMY_ECHO = DEBUG
 REDIS_HOST = 'localhost'
 REDIS_PORT = 6379
 
+# List Pagination
+DEFAULT_PAGE_SIZE = 50   # rows per page when only a cursor is given
+MAX_PAGE_SIZE = 500
+
+# Task Result Store (SQLite in WAL mode, keyed by taskId)
+TASK_RESULTS_DB = os.getenv('TASK_RESULTS_DB', 'task_results.db')
+TASK_RESULT_TTL = int(os.getenv('TASK_RESULT_TTL', 24 * 60 * 60))  # seconds
+
+# Task Coalescing
+COALESCE_WINDOW = int(os.getenv('COALESCE_WINDOW', 30))  # seconds a coalescing key stays live
+
+# Admission Queue Limits
+ADMISSION_QUEUE_CAPACITY = int(os.getenv('ADMISSION_QUEUE_CAPACITY', 10000))  # total queued tasks
+ADMISSION_PRIORITY_CAPACITY = int(os.getenv('ADMISSION_PRIORITY_CAPACITY', 5000))  # queued tasks per priority level
+ADMISSION_TENANT_CAPACITY = int(os.getenv('ADMISSION_TENANT_CAPACITY', 1000))  # queued tasks per user
+ADMISSION_DRAIN_RATE = float(os.getenv('ADMISSION_DRAIN_RATE', 50))  # expected tasks/sec, used for Retry-After
+ADMISSION_FORWARD_DEPTH = int(os.getenv('ADMISSION_FORWARD_DEPTH', 500))  # admitted tasks kept waiting on the Redis queue
+ADMISSION_FORWARD_BATCH = int(os.getenv('ADMISSION_FORWARD_BATCH', 100))  # max tasks moved to Redis per pass
+ADMISSION_FORWARD_INTERVAL = float(os.getenv('ADMISSION_FORWARD_INTERVAL', 0.05))  # seconds between passes when idle or throttled
+
+# Fair Scheduling
+PRIORITY_AGING_RATE = float(os.getenv('PRIORITY_AGING_RATE', 0.1))  # priority points gained per second of waiting
+FAIR_SHARE_COST = float(os.getenv('FAIR_SHARE_COST', 1.0))  # priority points a user pays per task served
+MAX_USER_TASK_PRIORITY = 5  # highest priority a non-admin may request via /tasks/submit
+
+# Worker Batching
+WORKER_BATCH_SIZE = int(os.getenv('WORKER_BATCH_SIZE', 50))  # max tasks per dequeue
+WORKER_BATCH_LINGER_MS = int(os.getenv('WORKER_BATCH_LINGER_MS', 20))  # wait to fill a partial batch
+
+# Task Retries
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', 5))  # attempts before a task is dead-lettered
+TASK_RETRY_BASE_DELAY = float(os.getenv('TASK_RETRY_BASE_DELAY', 2.0))  # seconds, doubled per attempt
+TASK_RETRY_MAX_DELAY = float(os.getenv('TASK_RETRY_MAX_DELAY', 300.0))
+DEAD_LETTER_MAX = 10000  # oldest dead letters are dropped beyond this
+
+# Recurring Jobs
+JOB_SCHEDULER_TICK = 1.0  # seconds per timer wheel tick
+JOB_LEADER_LOCK_FILE = os.getenv('JOB_LEADER_LOCK_FILE', 'logs/job_scheduler.lock')
+
 # Rate Limiting
 RATE_LIMIT = 100  # requests per window
 RATE_WINDOW = 60  # seconds
@@ -0,0 +1,47 @@
+import hashlib
+import threading
+from schema_cache import read_version, bump_version
+from json_provider import dumps
+from config import DASHBOARD_FIELDS_VERSION_FILE
+
+class DashboardFieldCache:
+    """Serialized dashboard field list, shared by every request in the process.
+
+    Writers bump a version file, as schema_cache does, so every worker on
+    the host reloads on its next request. The ETag is a hash of the body,
+    so processes holding the same fields hand out the same ETag.
+    """
+
+    def __init__(self, version_file):
+        self.version_file = version_file
+        self.lock = threading.Lock()
+        self.version = None
+        self.body = None
+        self.etag = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, load):
+        """(JSON body, ETag) for the field list; load() returns the list of field dicts on a miss"""
+        version = read_version(self.version_file)
+        with self.lock:
+            if self.body is not None and version == self.version:
+                self.hits += 1
+                return self.body, self.etag
+            self.misses += 1
+
+        # Stored under the version read before loading, so a write during
+        # the load makes the next request reload again
+        body = dumps({'fields': load()})
+        etag = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            self.version, self.body, self.etag = version, body, etag
+        return body, etag
+
+    def invalidate(self):
+        """Drop the cached list here and in every other process"""
+        bump_version(self.version_file)
+        with self.lock:
+            self.body = None
+
+dashboard_field_cache = DashboardFieldCache(DASHBOARD_FIELDS_VERSION_FILE)
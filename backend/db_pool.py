@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import mysql.connector as con
+from config import (
+    MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB, MYSQL_PORT,
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_PING_INTERVAL, DB_POOL_RECYCLE, DB_STATEMENT_CACHE_SIZE
+)
+
+class PoolExhausted(Exception):
+    """Raised when no connection is free within the checkout timeout"""
+
+class PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used', 'statements')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.statements = {}   # SQL -> prepared cursor, least recently used first
+
+    def statement(self, sql):
+        """Prepared cursor for sql on this connection.
+
+        Each cursor keeps its server-side statement, so executing the same
+        SQL again skips parsing and planning. The least recently used
+        statement is closed once DB_STATEMENT_CACHE_SIZE are held.
+        """
+        cursor = self.statements.pop(sql, None)
+        if cursor is None:
+            if len(self.statements) >= DB_STATEMENT_CACHE_SIZE:
+                self.statements.pop(next(iter(self.statements))).close()
+            cursor = self.conn.cursor(prepared=True)
+        self.statements[sql] = cursor
+        return cursor
+
+    def forget(self, sql):
+        cursor = self.statements.pop(sql, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+class ConnectionPool:
+    """Bounded pool of raw mysql.connector connections.
+
+    At most `size` connections exist at once; checkout() waits up to
+    `timeout` seconds for one to be returned. Connections idle for more
+    than `ping_interval` seconds are pinged before reuse, and connections
+    older than `recycle` seconds are replaced, so a dropped socket or a
+    server-side wait_timeout never reaches a request.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, ping_interval=DB_POOL_PING_INTERVAL,
+                 recycle=DB_POOL_RECYCLE, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.recycle = recycle
+        self.connect_args = connect_args
+        self.idle = deque()   # most recently returned last, so hot connections are reused
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.created = 0
+        self.replaced = 0
+        self.waits = 0
+
+    def checkout(self):
+        if not self.slots.acquire(blocking=False):
+            self.waits += 1
+            if not self.slots.acquire(timeout=self.timeout):
+                raise PoolExhausted(f"No database connection free after {self.timeout}s")
+        try:
+            return self._take_healthy()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, pooled):
+        try:
+            if pooled.conn.in_transaction:
+                pooled.conn.rollback()
+            pooled.last_used = time.monotonic()
+            with self.lock:
+                self.idle.append(pooled)
+        except Exception as e:
+            logging.warning(f"Discarding broken database connection: {e}")
+            self._close(pooled)
+        finally:
+            self.slots.release()
+
+    def discard(self, pooled):
+        """Close a checked-out connection instead of returning it"""
+        self._close(pooled)
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            idle = len(self.idle)
+        return {
+            'size': self.size,
+            'idle': idle,
+            'created': self.created,
+            'replaced': self.replaced,
+            'waits': self.waits
+        }
+
+    def _take_healthy(self):
+        while True:
+            with self.lock:
+                pooled = self.idle.pop() if self.idle else None
+            if pooled is None:
+                return self._connect()
+            now = time.monotonic()
+            if now - pooled.created_at > self.recycle:
+                self._close(pooled)
+                self.replaced += 1
+                continue
+            if now - pooled.last_used > self.ping_interval:
+                try:
+                    pooled.conn.ping(reconnect=False)
+                except Exception:
+                    self._close(pooled)
+                    self.replaced += 1
+                    continue
+            return pooled
+
+    def _connect(self):
+        pooled = PooledConnection(con.connect(**self.connect_args))
+        self.created += 1
+        return pooled
+
+    def _close(self, pooled):
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+pool = ConnectionPool(
+    host=MYSQL_HOST,
+    user=MYSQL_USER,
+    password=MYSQL_PASSWORD,
+    database=MYSQL_DB,
+    port=MYSQL_PORT
+)
+
+@contextmanager
+def db_cursor(dictionary=True):
+    """Check out a pooled connection and yield a cursor on it.
+
+    Commits when the block succeeds and rolls back if it raises; the
+    connection goes back to the pool either way.
+    """
+    pooled = pool.checkout()
+    try:
+        cursor = pooled.conn.cursor(dictionary=dictionary)
+    except Exception:
+        # Dropped since its last ping; close it so the pool slot is freed
+        pool.discard(pooled)
+        raise
+    try:
+        yield cursor
+        pooled.conn.commit()
+    except Exception:
+        pooled.conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        pool.release(pooled)
+
+@contextmanager
+def prepared_cursor(sql):
+    """Yield a cursor with sql prepared on a pooled connection.
+
+    Call cursor.execute(sql, params) with the same sql. The statement is
+    prepared on the first use per connection and reused afterwards.
+    Commits or rolls back like db_cursor().
+    """
+    with prepared_cursors(sql) as (cursor,):
+        yield cursor
+
+@contextmanager
+def prepared_cursors(*sqls):
+    """Like prepared_cursor(), with one cursor per sql on the same connection and transaction"""
+    pooled = pool.checkout()
+    try:
+        cursors = [pooled.statement(sql) for sql in sqls]
+    except Exception:
+        pool.discard(pooled)
+        raise
+    try:
+        yield cursors
+        pooled.conn.commit()
+    except Exception:
+        # The statements may be half-executed; prepare them afresh next time
+        for sql in sqls:
+            pooled.forget(sql)
+        pooled.conn.rollback()
+        raise
+    finally:
+        pool.release(pooled)
+
+@contextmanager
+def streaming_cursor():
+    """Yield an unbuffered cursor for reading a large result in chunks.
+
+    Rows stay on the server until fetched. If the block exits before the
+    result is fully read (for example a client disconnects mid-download),
+    the connection is closed rather than returned with unread rows on it.
+    """
+    pooled = pool.checkout()
+    completed = False
+    try:
+        cursor = pooled.conn.cursor(buffered=False)
+        yield cursor
+        cursor.close()
+        pooled.conn.commit()
+        completed = True
+    finally:
+        if completed:
+            pool.release(pooled)
+        else:
+            pool.discard(pooled)
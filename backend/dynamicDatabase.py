@@ -1,16 +1,22 @@
-import mysql.connector as con
+import hashlib
+import json
+import math
 import re
-
-# ================= DATABASE CONNECTION =================
-connector = con.connect(
-    host='localhost',
-    user='root',
-    password='Soul#13211993',
-    database='govconnect'
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from db_pool import db_cursor, prepared_cursor, prepared_cursors, streaming_cursor
+from schema_cache import schema_cache
+from pagination import encode_cursor, decode_cursor_values, parse_limit
+from config import (
+    DYNAMIC_BULK_BATCH_SIZE, DYNAMIC_BULK_MAX_ERRORS, DYNAMIC_FIELD_DROP_BATCH, DYNAMIC_EXPORT_CHUNK_SIZE,
+    DYNAMIC_AGGREGATE_CACHE_TTL, DYNAMIC_AGGREGATE_CACHE_SIZE, DYNAMIC_AGGREGATE_MAX_GROUPS,
+    DYNAMIC_SYNC_OVERLAP, DYNAMIC_SYNC_MAX_CHANGES, DYNAMIC_TOMBSTONE_RETENTION
 )
 
-cursor = connector.cursor(dictionary=True)
-
 # ================= CONFIG =================
 ALLOWED_TYPES = {
     "string": "VARCHAR(255)",
@@ -27,18 +33,351 @@ def is_valid_identifier(name: str) -> bool:
     return bool(re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name))
 
 
+# ================= ROW VALIDATION =================
+# Converters take a non-None client value and return the value to store,
+# raising ValueError if it does not fit the column type
+def _to_string(value):
+    if type(value) is not str or len(value) > 255:
+        raise ValueError("expected a string of at most 255 characters")
+    return value
+
+
+def _to_text(value):
+    if type(value) is not str:
+        raise ValueError("expected a string")
+    return value
+
+
+def _to_int(value):
+    kind = type(value)
+    if kind is str:
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError("expected a 32-bit integer")
+    elif kind is float and value.is_integer():
+        value = int(value)
+    elif kind is not int:
+        raise ValueError("expected a 32-bit integer")
+    if not -2**31 <= value < 2**31:
+        raise ValueError("expected a 32-bit integer")
+    return value
+
+
+def _to_float(value):
+    kind = type(value)
+    if kind is str:
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError("expected a number")
+    elif kind is not float and kind is not int:
+        raise ValueError("expected a number")
+    if not math.isfinite(value):
+        raise ValueError("expected a finite number")
+    return float(value)
+
+
+_BOOL_VALUES = {True: True, False: False, "true": True, "false": False, "1": True, "0": False}
+
+
+def _to_bool(value):
+    kind = type(value)
+    if kind is str:
+        value = value.lower()
+    elif kind is not bool and kind is not int:
+        raise ValueError("expected a boolean")
+    # 1 and 0 look up as True and False
+    result = _BOOL_VALUES.get(value)
+    if result is None:
+        raise ValueError("expected a boolean")
+    return result
+
+
+def _to_date(value):
+    if type(value) is date:
+        return value.isoformat()
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError("expected a date (YYYY-MM-DD)")
+    return value
+
+
+CONVERTERS = {
+    "string": _to_string,
+    "text": _to_text,
+    "int": _to_int,
+    "float": _to_float,
+    "bool": _to_bool,
+    "date": _to_date
+}
+
+
+class RowValidator:
+    """Checks and coerces rows for one dynamic table.
+
+    Built from the table's metadata and cached by schema_cache until the
+    schema changes, so a row is checked in-process with one converter call
+    per field and bad rows never reach MySQL.
+    """
+
+    def __init__(self, columns):
+        self.names = [c["field_name"] for c in columns]
+        self.converters = {c["field_name"]: CONVERTERS[c["data_type"]] for c in columns}
+
+    def check(self, row):
+        """Coerced copy of a row dict holding some of the fields; None values are kept"""
+        converters = self.converters
+        if type(row) is not dict:
+            raise ValueError("expected an object")
+        if not converters.keys() >= row.keys():
+            unknown = [k for k in row if k not in converters]
+            raise ValueError(f"unknown field(s): {', '.join(map(str, unknown))}")
+        checked = {}
+        for k, v in row.items():
+            if v is not None:
+                try:
+                    v = converters[k](v)
+                except ValueError as e:
+                    raise ValueError(f"{k}: {e}")
+            checked[k] = v
+        return checked
+
+    def values(self, row):
+        """Coerced values in column order, None for fields the row leaves out"""
+        checked = self.check(row)
+        return [checked.get(name) for name in self.names]
+
+
+def get_validator(table_name):
+    """Cached RowValidator for a dynamic table; raises ValueError if there is no such table"""
+    validator = schema_cache.get_derived(table_name, "validator", RowValidator)
+    if not validator.names:
+        raise ValueError(f"Table {table_name} not found")
+    return validator
+
+
 # ================= METADATA TABLE =================
 def setup_metadata_table():
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dynamic_table_meta (
-            table_name VARCHAR(255),
-            field_name VARCHAR(255),
-            data_type VARCHAR(50),
-            show_ui BOOLEAN,
-            PRIMARY KEY (table_name, field_name)
-        )
+    with db_cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dynamic_table_meta (
+                table_name VARCHAR(255),
+                field_name VARCHAR(255),
+                data_type VARCHAR(50),
+                show_ui BOOLEAN,
+                storage VARCHAR(16) NOT NULL DEFAULT 'table',
+                filterable BOOLEAN NOT NULL DEFAULT FALSE,
+                PRIMARY KEY (table_name, field_name)
+            )
+        """)
+
+        # Metadata tables created before document storage lack these columns
+        cursor.execute("SHOW COLUMNS FROM dynamic_table_meta")
+        if "storage" not in {row["Field"] for row in cursor.fetchall()}:
+            cursor.execute("""
+                ALTER TABLE dynamic_table_meta
+                ADD COLUMN storage VARCHAR(16) NOT NULL DEFAULT 'table',
+                ADD COLUMN filterable BOOLEAN NOT NULL DEFAULT FALSE
+            """)
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{DOCUMENT_TABLE}` (
+                id BIGINT AUTO_INCREMENT,
+                table_name VARCHAR(64) NOT NULL,
+                doc JSON NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                PRIMARY KEY (table_name, id),
+                KEY (id),
+                KEY ix_updated_at (table_name, updated_at)
+            )
+        """)
+
+        cursor.execute("SHOW TABLES LIKE %s", (DOCUMENT_INDEX_TABLE,))
+        index_exists = bool(cursor.fetchall())
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{DOCUMENT_INDEX_TABLE}` (
+                table_name VARCHAR(64) NOT NULL,
+                field_name VARCHAR(255) NOT NULL,
+                id BIGINT NOT NULL,
+                num_value DOUBLE NULL,
+                str_value VARCHAR(255) NULL,
+                PRIMARY KEY (table_name, field_name, id),
+                KEY ix_num (table_name, field_name, num_value),
+                KEY ix_str (table_name, field_name, str_value),
+                KEY ix_document (table_name, id)
+            )
+        """)
+
+        # Earlier versions indexed filterable fields with virtual columns on the shared table
+        cursor.execute(f"SHOW COLUMNS FROM `{DOCUMENT_TABLE}` LIKE 'g\\_%'")
+        for row in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE `{DOCUMENT_TABLE}` DROP INDEX `ix_{row['Field']}`, DROP COLUMN `{row['Field']}`")
+        if not index_exists:
+            cursor.execute("""
+                SELECT table_name, field_name, data_type FROM dynamic_table_meta
+                WHERE storage = 'document' AND filterable
+            """)
+            for row in cursor.fetchall():
+                _backfill_document_index(cursor, row["table_name"], row["field_name"], row["data_type"])
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{TOMBSTONE_TABLE}` (
+                table_name VARCHAR(64) NOT NULL,
+                id BIGINT NOT NULL,
+                deleted_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6),
+                PRIMARY KEY (table_name, id),
+                KEY ix_deleted_at (table_name, deleted_at),
+                KEY ix_purge (deleted_at)
+            )
+        """)
+
+        # Tables created before delta sync have no updated_at
+        _add_updated_at(cursor, DOCUMENT_TABLE, "`table_name`, `updated_at`")
+        cursor.execute("SELECT DISTINCT table_name FROM dynamic_table_meta WHERE storage = 'table'")
+        for row in cursor.fetchall():
+            _add_updated_at(cursor, row["table_name"], "`updated_at`")
+    schema_cache.invalidate()
+
+
+def _add_updated_at(cursor, table_name, index_columns):
+    cursor.execute(f"SHOW COLUMNS FROM `{table_name}` LIKE 'updated_at'")
+    if cursor.fetchall():
+        return
+    cursor.execute(f"""
+        ALTER TABLE `{table_name}`
+        ADD COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+        ADD KEY ix_updated_at ({index_columns})
     """)
-    connector.commit()
+
+
+# ================= DOCUMENT STORAGE =================
+# Document tables keep their rows as JSON documents in one shared table, so
+# adding or dropping a field only touches dynamic_table_meta. Values of
+# filterable fields are also written to a side table keyed by
+# (table_name, field_name, value), so each document table pays only for its
+# own indexed fields and any number of them can exist.
+DOCUMENT_TABLE = "dynamic_documents"
+DOCUMENT_INDEX_TABLE = "dynamic_document_index"
+STORAGE_MODES = {"table", "document"}
+DOCUMENT_CASTS = {"int": "SIGNED", "bool": "SIGNED", "float": "DOUBLE", "date": "DATE"}
+NUMERIC_INDEX_TYPES = {"int", "float", "bool"}
+
+
+def _is_document(columns):
+    return bool(columns) and columns[0]["storage"] == "document"
+
+
+def _field_sql(column, document):
+    """SQL expression for a field's value in a dynamic table"""
+    name = column["field_name"]
+    if not document:
+        return f"`{name}`"
+    cast = DOCUMENT_CASTS.get(column["data_type"])
+    value = f"`doc`->>'$.{name}'"
+    return f"CAST({value} AS {cast})" if cast else value
+
+
+def _table_sql(table_name, columns):
+    """(FROM target, WHERE terms scoping it to the table, their params, field -> SQL expression)"""
+    document = _is_document(columns)
+    exprs = {c["field_name"]: _field_sql(c, document) for c in columns}
+    exprs["id"] = "`id`"
+    if document:
+        return f"`{DOCUMENT_TABLE}`", ["`table_name` = %s"], [table_name], exprs
+    return f"`{table_name}`", [], [], exprs
+
+
+def _placeholders(columns):
+    """field -> SQL for a bound value compared with it, where plain %s would not match.
+
+    Table-mode float fields are single-precision FLOAT columns, so a value
+    is rounded to FLOAT before comparing; the double it came from (such as
+    a cursor value) would never be equal to the stored value.
+    """
+    if _is_document(columns):
+        return {}
+    return {c["field_name"]: "CAST(%s AS FLOAT)" for c in columns if c["data_type"] == "float"}
+
+
+def _to_document(validator, data, keep_nulls=False):
+    """Document dict for a row. None values are left out, or kept as nulls for JSON_MERGE_PATCH."""
+    doc = {}
+    for k, v in validator.check(data).items():
+        if v is None and not keep_nulls:
+            continue
+        # Stored like a BOOLEAN column so both modes return 0/1
+        doc[k] = int(v) if type(v) is bool else v
+    return doc
+
+
+def _indexed_fields(columns):
+    """field name -> data type for a document table's filterable fields"""
+    return {c["field_name"]: c["data_type"] for c in columns if c["filterable"]}
+
+
+def _index_entries(table_name, record_id, doc, indexed):
+    """dynamic_document_index rows for the non-null filterable values in doc"""
+    entries = []
+    for field, data_type in indexed.items():
+        value = doc.get(field)
+        if value is None:
+            continue
+        if data_type in NUMERIC_INDEX_TYPES:
+            entries.append((table_name, field, record_id, float(value), None))
+        else:
+            entries.append((table_name, field, record_id, None, value))
+    return entries
+
+
+def _write_index_entries(cursor, entries):
+    if entries:
+        cursor.executemany(f"""
+            INSERT INTO `{DOCUMENT_INDEX_TABLE}` (table_name, field_name, id, num_value, str_value)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE num_value = VALUES(num_value), str_value = VALUES(str_value)
+        """, entries)
+
+
+def _index_filter(table_name, field, data_type):
+    """WHERE term template and leading params matching documents by an indexed field"""
+    column = "num_value" if data_type in NUMERIC_INDEX_TYPES else "str_value"
+    term = (f"`id` IN (SELECT `id` FROM `{DOCUMENT_INDEX_TABLE}` "
+            f"WHERE `table_name` = %s AND `field_name` = %s AND `{column}` {{op}} %s)")
+    return term, [table_name, field]
+
+
+def _document_row(record_id, doc, fields, types):
+    """Row dict for a stored document, shaped like a row of a table-mode table"""
+    doc = json.loads(doc) if isinstance(doc, (str, bytes, bytearray)) else doc
+    row = {"id": record_id}
+    for f in fields:
+        value = doc.get(f)
+        if value is not None and types[f] == "date":
+            # A value written under an earlier type of the field reads as null
+            try:
+                value = date.fromisoformat(value)
+            except (TypeError, ValueError):
+                value = None
+        row[f] = value
+    return row
+
+
+def _backfill_document_index(cursor, table_name, field_name, data_type):
+    """Index the stored values of a field that has just become filterable"""
+    value = f"`doc`->>'$.{field_name}'"
+    if data_type in NUMERIC_INDEX_TYPES:
+        num_value, str_value = f"CAST({value} AS DOUBLE)", "NULL"
+    else:
+        num_value, str_value = "NULL", value
+    cursor.execute(f"""
+        INSERT IGNORE INTO `{DOCUMENT_INDEX_TABLE}` (table_name, field_name, id, num_value, str_value)
+        SELECT `table_name`, %s, `id`, {num_value}, {str_value}
+        FROM `{DOCUMENT_TABLE}`
+        WHERE `table_name` = %s AND JSON_TYPE(`doc`->'$.{field_name}') <> 'NULL'
+    """, (field_name, table_name))
 
 
 # ================= CREATE DYNAMIC TABLE =================
@@ -46,7 +385,9 @@ def create_dynamic_database(
     table_name: str,
     fields: list,
     data_type: list,
-    show: list
+    show: list,
+    storage: str = "table",
+    filterable: list = None
 ):
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
@@ -54,6 +395,17 @@ def create_dynamic_database(
     if not (len(fields) == len(data_type) == len(show)):
         raise ValueError("fields, data_type, show must be same length")
 
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Invalid storage: {storage}")
+
+    filterable = filterable or [False] * len(fields)
+    if len(filterable) != len(fields):
+        raise ValueError("filterable must be the same length as fields")
+
+    existing = {c["field_name"]: c for c in schema_cache.get_fields(table_name)}
+    if existing and _is_document(list(existing.values())) != (storage == "document"):
+        raise ValueError(f"Table {table_name} already exists with different storage")
+
     columns_sql = []
 
     for f, dt in zip(fields, data_type):
@@ -65,31 +417,103 @@ def create_dynamic_database(
 
         columns_sql.append(f"`{f}` {ALLOWED_TYPES[dt]}")
 
+    if storage == "document":
+        _create_document_fields(table_name, fields, data_type, show, filterable, existing)
+        return
+
     create_table_sql = f"""
         CREATE TABLE IF NOT EXISTS `{table_name}` (
             id INT AUTO_INCREMENT PRIMARY KEY,
             {', '.join(columns_sql)},
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            KEY ix_updated_at (updated_at)
         )
     """
 
     try:
-        cursor.execute(create_table_sql)
+        with db_cursor() as cursor:
+            cursor.execute(create_table_sql)
 
-        for f, dt, s in zip(fields, data_type, show):
-            cursor.execute("""
-                INSERT INTO dynamic_table_meta (table_name, field_name, data_type, show_ui)
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    data_type = VALUES(data_type),
-                    show_ui = VALUES(show_ui)
-            """, (table_name, f, dt, bool(s)))
+            for f, dt, s in zip(fields, data_type, show):
+                cursor.execute("""
+                    INSERT INTO dynamic_table_meta (table_name, field_name, data_type, show_ui)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        data_type = VALUES(data_type),
+                        show_ui = VALUES(show_ui)
+                """, (table_name, f, dt, bool(s)))
+    finally:
+        # DDL commits implicitly, so invalidate even if the metadata insert failed
+        schema_cache.invalidate()
+
+
+def _create_document_fields(table_name, fields, data_type, show, filterable, existing):
+    if len(table_name) > 64:
+        raise ValueError("Document table names are limited to 64 characters")
+    for f, dt, indexed in zip(fields, data_type, filterable):
+        if f in existing and existing[f]["data_type"] != dt:
+            raise ValueError(f"Field {f} is already {existing[f]['data_type']}")
+        if indexed and dt == "text":
+            raise ValueError(f"Text field {f} cannot be filterable")
+
+    newly_indexed = []
+    try:
+        with db_cursor() as cursor:
+            for f, dt, s, indexed in zip(fields, data_type, show, filterable):
+                indexed = bool(indexed) or bool(existing.get(f, {}).get("filterable"))
+                if indexed and not existing.get(f, {}).get("filterable"):
+                    newly_indexed.append((f, dt))
+                cursor.execute("""
+                    INSERT INTO dynamic_table_meta (table_name, field_name, data_type, show_ui, storage, filterable)
+                    VALUES (%s, %s, %s, %s, 'document', %s)
+                    ON DUPLICATE KEY UPDATE
+                        show_ui = VALUES(show_ui),
+                        filterable = VALUES(filterable)
+                """, (table_name, f, dt, bool(s), indexed))
+    finally:
+        schema_cache.invalidate()
 
-        connector.commit()
+    # Writers index new rows themselves once they see the field as filterable;
+    # INSERT IGNORE skips the rows they have already indexed
+    if newly_indexed:
+        with db_cursor() as cursor:
+            for f, dt in newly_indexed:
+                _backfill_document_index(cursor, table_name, f, dt)
 
-    except Exception as e:
-        connector.rollback()
-        raise e
+
+# ================= STATEMENTS =================
+@lru_cache(maxsize=1024)
+def _statement(operation, table_name, columns=()):
+    """SQL for a per-table operation, built once per (operation, table, column set).
+
+    The same string comes back every time, so prepared_cursor() finds the
+    statement already prepared on the connection.
+    """
+    names = ", ".join(f"`{c}`" for c in columns)
+    if operation == "insert":
+        return f"INSERT INTO `{table_name}` ({names}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if operation == "select":
+        return f"SELECT `id`, {names} FROM `{table_name}`"
+    if operation == "update":
+        return f"UPDATE `{table_name}` SET {', '.join(f'`{c}` = %s' for c in columns)} WHERE `id` = %s"
+    if operation == "insert_document":
+        return f"INSERT INTO `{DOCUMENT_TABLE}` (table_name, doc) VALUES (%s, %s)"
+    if operation == "unindex_document_field":
+        return f"DELETE FROM `{DOCUMENT_INDEX_TABLE}` WHERE table_name = %s AND field_name = %s AND id = %s"
+    if operation == "select_document":
+        return f"SELECT id, doc FROM `{DOCUMENT_TABLE}` WHERE table_name = %s"
+    if operation == "update_document":
+        # A null in the patch removes the field from the document
+        return f"UPDATE `{DOCUMENT_TABLE}` SET doc = JSON_MERGE_PATCH(doc, %s) WHERE table_name = %s AND id = %s"
+    raise ValueError(f"Unknown statement: {operation}")
+
+
+def _checked_columns(validator, data):
+    """(declared columns present in data, in table order; their coerced values)"""
+    checked = validator.check(data)
+    columns = tuple(name for name in validator.names if name in checked)
+    return columns, [checked[name] for name in columns]
 
 
 # ================= INSERT DATA =================
@@ -97,82 +521,684 @@ def insert_dynamic_data(table_name: str, data: dict):
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
 
-    fields = []
-    placeholders = []
-    values = []
+    validator = get_validator(table_name)
+    fields = schema_cache.get_fields(table_name)
+    if _is_document(fields):
+        sql = _statement("insert_document", table_name)
+        doc = _to_document(validator, data)
+        values = (table_name, json.dumps(doc))
+        indexed = _indexed_fields(fields)
+        if indexed:
+            # The document and its index entries commit together
+            with db_cursor() as cursor:
+                cursor.execute(sql, values)
+                _write_index_entries(cursor, _index_entries(table_name, cursor.lastrowid, doc, indexed))
+            _forget_aggregates(table_name)
+            return
+    else:
+        columns, values = _checked_columns(validator, data)
+        sql = _statement("insert", table_name, columns)
+
+    with prepared_cursor(sql) as cursor:
+        cursor.execute(sql, values)
+    _forget_aggregates(table_name)
 
-    for k, v in data.items():
-        if not is_valid_identifier(k):
-            raise ValueError(f"Invalid field name: {k}")
 
-        fields.append(f"`{k}`")
-        placeholders.append("%s")
-        values.append(v)
+# ================= BULK INSERT =================
+def parse_ndjson(lines):
+    """Yield (line number, row) for each non-blank NDJSON line; row is a ValueError if unparseable"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"invalid JSON: {e}")
 
-    sql = f"""
-        INSERT INTO `{table_name}` ({', '.join(fields)})
-        VALUES ({', '.join(placeholders)})
+
+def bulk_insert_dynamic_data(table_name: str, rows, batch_size=DYNAMIC_BULK_BATCH_SIZE):
+    """Insert (row number, row dict) pairs in batches of batch_size, one transaction per batch.
+
+    Rows are validated against the cached column metadata first. A row that
+    fails validation or is rejected by the database is reported and skipped
+    without affecting the rest of the load.
     """
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+
+    validator = get_validator(table_name)
+    names = validator.names
+    columns = schema_cache.get_fields(table_name)
+    document = _is_document(columns)
+    indexed = _indexed_fields(columns) if document else {}
+
+    if document:
+        sql = f"INSERT INTO `{DOCUMENT_TABLE}` (table_name, doc) VALUES (%s, %s)"
+    else:
+        sql = f"""
+            INSERT INTO `{table_name}` ({', '.join(f'`{n}`' for n in names)})
+            VALUES ({', '.join(['%s'] * len(names))})
+        """
 
-    cursor.execute(sql, values)
-    connector.commit()
+    result = {"inserted": 0, "failed": 0, "errors": []}
+
+    def fail(number, error):
+        result["failed"] += 1
+        if len(result["errors"]) < DYNAMIC_BULK_MAX_ERRORS:
+            result["errors"].append({"row": number, "error": str(error)})
+
+    def insert_one(cursor, values):
+        if indexed:
+            # values is [table name, JSON, document]
+            cursor.execute(sql, values[:2])
+            _write_index_entries(cursor, _index_entries(table_name, cursor.lastrowid, values[2], indexed))
+        else:
+            cursor.execute(sql, values)
+
+    def flush(batch):
+        try:
+            with db_cursor() as cursor:
+                if indexed:
+                    # Each row's id is needed for its index entries
+                    for _number, values in batch:
+                        insert_one(cursor, values)
+                else:
+                    cursor.executemany(sql, [values for _number, values in batch])
+            result["inserted"] += len(batch)
+        except Exception:
+            # Find the bad rows one by one; the good ones still go in together
+            with db_cursor() as cursor:
+                for number, values in batch:
+                    try:
+                        insert_one(cursor, values)
+                        result["inserted"] += 1
+                    except Exception as e:
+                        fail(number, e)
+
+    batch = []
+    for number, row in rows:
+        try:
+            if isinstance(row, Exception):
+                raise row
+            if document:
+                doc = _to_document(validator, row)
+                values = [table_name, json.dumps(doc)] + ([doc] if indexed else [])
+            else:
+                values = validator.values(row)
+        except ValueError as e:
+            fail(number, e)
+            continue
+
+        batch.append((number, values))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    _forget_aggregates(table_name)
+
+    result["errors"].sort(key=lambda e: e["row"])
+    return result
 
 
 # ================= FETCH DATA =================
-def fetch_dynamic_data(table_name: str, ui_only=True):
+def fetch_dynamic_data(table_name: str, ui_only=True, with_sync_cursor=False):
+    """All rows of a dynamic table.
+
+    With with_sync_cursor, returns (rows, sync cursor), reading the database
+    clock on the same connection and in the same transaction as the rows.
+    """
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
 
-    if ui_only:
-        cursor.execute("""
-            SELECT field_name FROM dynamic_table_meta
-            WHERE table_name=%s AND show_ui=TRUE
-        """, (table_name,))
+    columns = schema_cache.get_fields(table_name)
+    fields = [row["field_name"] for row in columns if row["show_ui"] or not ui_only]
+    if not fields:
+        if with_sync_cursor:
+            with prepared_cursor(SYNC_NOW_SQL) as cursor:
+                cursor.execute(SYNC_NOW_SQL)
+                return [], _sync_cursor(cursor.fetchall()[0][0])
+        return []
+
+    if _is_document(columns):
+        sql = _statement("select_document", table_name)
+        params = (table_name,)
     else:
-        cursor.execute("""
-            SELECT field_name FROM dynamic_table_meta
-            WHERE table_name=%s
-        """, (table_name,))
+        sql = _statement("select", table_name, tuple(fields))
+        params = ()
+
+    statements = [SYNC_NOW_SQL, sql] if with_sync_cursor else [sql]
+    with prepared_cursors(*statements) as cursors:
+        if with_sync_cursor:
+            # Taken before reading, so nothing committed after the read is skipped
+            cursors[0].execute(SYNC_NOW_SQL)
+            next_cursor = _sync_cursor(cursors[0].fetchall()[0][0])
+        cursor = cursors[-1]
+        cursor.execute(sql, params)
+        fetched = cursor.fetchall()
 
-    fields = [row["field_name"] for row in cursor.fetchall()]
+    if _is_document(columns):
+        types = {c["field_name"]: c["data_type"] for c in columns}
+        rows = [_document_row(record_id, doc, fields, types) for record_id, doc in fetched]
+    else:
+        names = ["id"] + fields
+        rows = [dict(zip(names, row)) for row in fetched]
+    return (rows, next_cursor) if with_sync_cursor else rows
+
+
+# ================= EXPORT DATA =================
+def export_dynamic_data(table_name: str, ui_only=True, chunk_size=DYNAMIC_EXPORT_CHUNK_SIZE):
+    """Return (columns, chunks) for streaming a whole table.
+
+    chunks yields lists of up to chunk_size row tuples read from an
+    unbuffered cursor, so memory use does not depend on table size. The
+    table is validated before this returns; rows are read lazily.
+    """
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+
+    meta = schema_cache.get_fields(table_name)
+    fields = [row["field_name"] for row in meta if row["show_ui"] or not ui_only]
     if not fields:
-        return []
+        raise ValueError(f"Table {table_name} not found")
+    columns = ["id"] + fields
+    document = _is_document(meta)
+    types = {c["field_name"]: c["data_type"] for c in meta}
 
-    sql = f"SELECT id, {', '.join(fields)} FROM `{table_name}`"
-    cursor.execute(sql)
-    return cursor.fetchall()
+    def chunks():
+        with streaming_cursor() as cursor:
+            if document:
+                cursor.execute(f"SELECT id, doc FROM `{DOCUMENT_TABLE}` WHERE table_name = %s ORDER BY id",
+                               (table_name,))
+            else:
+                cursor.execute(f"SELECT {', '.join(f'`{c}`' for c in columns)} FROM `{table_name}` ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if document:
+                    rows = [tuple(_document_row(i, doc, fields, types).values()) for i, doc in rows]
+                yield rows
 
+    return columns, chunks()
 
-# ================= UPDATE DATA =================
-def update_dynamic_data(table_name: str, record_id: int, data: dict):
+
+# ================= QUERY DATA =================
+# Query parameters: <field>=v for equality, <field>__<op>=v for the others
+FILTER_OPS = {
+    "eq": "=",
+    "ne": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+RANGE_TYPES = {"string", "int", "float", "date"}
+QUERY_RESERVED = {"ui_only", "sort", "limit", "cursor"}
+
+
+def _filter_clauses(types, exprs, args, reserved, indexed=None, placeholders=None):
+    """WHERE terms and parameters for the filter parameters in args.
+
+    indexed maps fields to (term template, leading params) from
+    _index_filter(), used instead of their expression. placeholders comes
+    from _placeholders().
+    """
+    placeholders = placeholders or {}
+    where = []
+    params = []
+    for key, raw in args.items():
+        if key in reserved:
+            continue
+        field, op = (key, "eq") if key in types else key.rpartition("__")[::2]
+        if field not in types:
+            raise ValueError(f"Unknown field: {field}")
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter operator: {op}")
+        if op not in ("eq", "ne") and types[field] not in RANGE_TYPES:
+            raise ValueError(f"Range filters are not supported on {types[field]} field {field}")
+        try:
+            value = CONVERTERS[types[field]](raw)
+        except ValueError as e:
+            raise ValueError(f"{field}: {e}")
+        if indexed and field in indexed:
+            term, term_params = indexed[field]
+            where.append(term.format(op=FILTER_OPS[op]))
+            params += term_params
+        else:
+            where.append(f"{exprs[field]} {FILTER_OPS[op]} {placeholders.get(field, '%s')}")
+        params.append(value)
+    return where, params
+
+
+def _index_filters(table_name, columns):
+    if not _is_document(columns):
+        return None
+    return {f: _index_filter(table_name, f, dt) for f, dt in _indexed_fields(columns).items()}
+
+
+def query_args(table_name: str, args: dict):
+    """The parameters in args that query_dynamic_data() acts on.
+
+    Keeps `sort`, `limit`, `cursor` and keys naming a declared field (with
+    or without an operator suffix); anything else, such as cache busters or
+    tracking parameters, is dropped. An unknown operator on a declared field
+    is kept so the query reports it.
+    """
+    columns = schema_cache.get_fields(table_name) if is_valid_identifier(table_name) else None
+    if not columns:
+        return {}
+    fields = {c["field_name"] for c in columns} | {"id"}
+    return {
+        key: value for key, value in args.items()
+        if key in QUERY_RESERVED - {"ui_only"} or key in fields or key.rpartition("__")[0] in fields
+    }
+
+
+def query_dynamic_data(table_name: str, args: dict, ui_only=True):
+    """Filtered, sorted, keyset-paginated read of a dynamic table.
+
+    args holds query parameters: filters on declared fields (`age__gte=30`),
+    `sort` (comma-separated fields, `-` prefix for descending), `limit` and
+    `cursor`. id is always the final sort key; `id` or `-id` in `sort` sets
+    its direction, otherwise it follows the last sort field. Every value is
+    bound as a parameter after conversion to the field's type. Returns
+    (rows, next cursor).
+    """
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
 
-    if not data:
-        raise ValueError("No data provided for update")
+    columns = schema_cache.get_fields(table_name)
+    if not columns:
+        raise ValueError(f"Table {table_name} not found")
+    types = {c["field_name"]: c["data_type"] for c in columns}
+    types["id"] = "int"
+    source, where, params, exprs = _table_sql(table_name, columns)
+
+    placeholders = _placeholders(columns)
+    filters, filter_params = _filter_clauses(types, exprs, args, QUERY_RESERVED,
+                                             _index_filters(table_name, columns), placeholders)
+    where += filters
+    params += filter_params
+
+    order = []
+    id_descending = None
+    for item in filter(None, args.get("sort", "").split(",")):
+        descending = item.startswith("-")
+        field = item.lstrip("-")
+        if field not in types or types[field] == "text":
+            raise ValueError(f"Cannot sort by {field}")
+        if field == "id":
+            # id is always the final key; an explicit id sets its direction
+            id_descending = descending
+        else:
+            order.append((field, descending))
+    if id_descending is None:
+        id_descending = order[-1][1] if order else False
+    order.append(("id", id_descending))
+
+    limit = parse_limit(args.get("limit"))
+    cursor = args.get("cursor")
+    if cursor:
+        values = decode_cursor_values(cursor, len(order))
+        # Keyset predicate; MySQL sorts NULL first ascending and last descending
+        alternatives = []
+        for i, (field, descending) in enumerate(order):
+            terms = []
+            for (prev, _desc), value in zip(order[:i], values[:i]):
+                if value is None:
+                    terms.append(f"{exprs[prev]} IS NULL")
+                else:
+                    terms.append(f"{exprs[prev]} = {placeholders.get(prev, '%s')}")
+                    params.append(value)
+            value = values[i]
+            holder = placeholders.get(field, "%s")
+            if value is None:
+                if descending:
+                    continue
+                terms.append(f"{exprs[field]} IS NOT NULL")
+            elif descending:
+                terms.append(f"({exprs[field]} < {holder} OR {exprs[field]} IS NULL)")
+                params.append(value)
+            else:
+                terms.append(f"{exprs[field]} > {holder}")
+                params.append(value)
+            alternatives.append("(" + " AND ".join(terms) + ")")
+        where.append("(" + (" OR ".join(alternatives) or "FALSE") + ")")
+
+    selected = ["id"] + [c["field_name"] for c in columns if c["show_ui"] or not ui_only]
+    # Sort keys are needed for the next cursor even when hidden from the UI
+    hidden_keys = [f for f, _d in order if f not in selected]
+    document = _is_document(columns)
+    if document:
+        sql = f"SELECT `id`, `doc` FROM {source}"
+    else:
+        sql = f"SELECT {', '.join(f'`{c}`' for c in selected + hidden_keys)} FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(f"{exprs[f]} {'DESC' if d else 'ASC'}" for f, d in order)
+    sql += " LIMIT %s"
+    params.append(limit + 1)
 
-    set_parts = []
-    values = []
+    with db_cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    if document:
+        rows = [_document_row(r["id"], r["doc"], selected[1:] + hidden_keys, types) for r in rows]
 
-    for k, v in data.items():
-        if not is_valid_identifier(k):
-            raise ValueError(f"Invalid field name: {k}")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][f] for f, _d in order])
+    for row in rows:
+        for f in hidden_keys:
+            del row[f]
+    return rows, next_cursor
 
-        set_parts.append(f"`{k}` = %s")
-        values.append(v)
 
-    values.append(record_id)
+# ================= DELTA SYNC =================
+TOMBSTONE_TABLE = "dynamic_tombstones"
 
-    sql = f"""
-        UPDATE `{table_name}`
-        SET {', '.join(set_parts)}
-        WHERE id = %s
+
+class SyncExpired(ValueError):
+    """Raised when a sync cursor is too old to return a complete delta"""
+
+
+SYNC_NOW_SQL = "SELECT NOW(6)"
+
+
+def _sync_cursor(now):
+    """Cursor for database time `now`, to pass as `since` on the next sync.
+
+    It is set DYNAMIC_SYNC_OVERLAP seconds back, so writes whose
+    transactions were still open at the time are not missed; rows changed
+    in that window are sent again on the next sync.
+    """
+    return encode_cursor([now - timedelta(seconds=DYNAMIC_SYNC_OVERLAP)])
+
+
+def sync_dynamic_data(table_name: str, since: str, ui_only=True):
+    """Rows written and ids deleted since a sync cursor.
+
+    Returns (changed rows, deleted ids, next cursor). Raises SyncExpired if
+    the cursor is older than the tombstone retention or the delta is larger
+    than DYNAMIC_SYNC_MAX_CHANGES; the client should then refetch the table.
     """
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+
+    columns = schema_cache.get_fields(table_name)
+    if not columns:
+        raise ValueError(f"Table {table_name} not found")
+    types = {c["field_name"]: c["data_type"] for c in columns}
+    fields = [c["field_name"] for c in columns if c["show_ui"] or not ui_only]
+    try:
+        since_at = datetime.fromisoformat(decode_cursor_values(since, 1)[0])
+    except (TypeError, ValueError):
+        raise ValueError("Invalid since cursor")
+
+    source, where, params, exprs = _table_sql(table_name, columns)
+    where.append("`updated_at` > %s")
+    params.append(since_at)
+    document = _is_document(columns)
+    selected = "`id`, `doc`" if document else ", ".join(f"`{c}`" for c in ["id"] + fields)
+
+    with db_cursor() as cur:
+        # Taken before reading, so nothing committed after the read is skipped
+        cur.execute("SELECT NOW(6) AS now, NOW(6) - INTERVAL %s SECOND AS oldest", (DYNAMIC_TOMBSTONE_RETENTION,))
+        clock = cur.fetchall()[0]
+        if since_at < clock["oldest"]:
+            raise SyncExpired("Sync cursor has expired; fetch the full table")
+        next_cursor = _sync_cursor(clock["now"])
+
+        cur.execute(f"""
+            SELECT {selected} FROM {source}
+            WHERE {' AND '.join(where)}
+            ORDER BY `updated_at`, `id`
+            LIMIT %s
+        """, params + [DYNAMIC_SYNC_MAX_CHANGES + 1])
+        changed = cur.fetchall()
+        if len(changed) > DYNAMIC_SYNC_MAX_CHANGES:
+            raise SyncExpired("Too many changes since the cursor; fetch the full table")
+
+        cur.execute(f"""
+            SELECT id FROM `{TOMBSTONE_TABLE}`
+            WHERE table_name = %s AND deleted_at > %s
+        """, (table_name, since_at))
+        deleted = [row["id"] for row in cur.fetchall()]
+
+    if document:
+        changed = [_document_row(r["id"], r["doc"], fields, types) for r in changed]
+    return changed, deleted, next_cursor
+
+
+# ================= AGGREGATE DATA =================
+AGGREGATE_FUNCS = {"count", "sum", "avg", "min", "max"}
+NUMERIC_TYPES = {"int", "float"}
+AGGREGATE_RESERVED = {"group_by", "metrics"}
+
+_aggregate_cache = OrderedDict()   # (table name, request key) -> (expires at, result), least recently used first
+_aggregate_lock = threading.Lock()
+
+
+def aggregate_dynamic_data(table_name: str, args: dict):
+    """Grouped aggregates over a dynamic table, computed in the database.
+
+    args holds `group_by` (comma-separated declared fields), `metrics`
+    (comma-separated `count` or `func:field`, func one of count, sum, avg,
+    min, max; all but count need an int or float field) and the same
+    filters as query_dynamic_data. Results are cached for
+    DYNAMIC_AGGREGATE_CACHE_TTL seconds, keeping at most
+    DYNAMIC_AGGREGATE_CACHE_SIZE results; writes through this module drop
+    the cached results for their table.
+    """
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+
+    columns = schema_cache.get_fields(table_name)
+    if not columns:
+        raise ValueError(f"Table {table_name} not found")
+    types = {c["field_name"]: c["data_type"] for c in columns}
+    types["id"] = "int"
+
+    group_by = [f for f in args.get("group_by", "").split(",") if f]
+    if len(group_by) > 4:
+        raise ValueError("At most 4 group_by fields")
+    for field in group_by:
+        if field not in types or types[field] == "text":
+            raise ValueError(f"Cannot group by {field}")
+
+    metrics = []
+    for item in filter(None, args.get("metrics", "count").split(",")):
+        func, _, field = item.partition(":")
+        if func not in AGGREGATE_FUNCS:
+            raise ValueError(f"Unknown aggregate: {func}")
+        if field:
+            if field not in types:
+                raise ValueError(f"Unknown field: {field}")
+            if func != "count" and types[field] not in NUMERIC_TYPES:
+                raise ValueError(f"{func} needs an int or float field, {field} is {types[field]}")
+        elif func != "count":
+            raise ValueError(f"{func} needs a field, e.g. {func}:price")
+        metrics.append((func, field))
+    if not metrics:
+        raise ValueError("No metrics requested")
+
+    source, where, params, exprs = _table_sql(table_name, columns)
+    filters, filter_params = _filter_clauses(types, exprs, args, AGGREGATE_RESERVED,
+                                             _index_filters(table_name, columns), _placeholders(columns))
+    where += filters
+    params += filter_params
+
+    key = (table_name, tuple(group_by), tuple(metrics), tuple(sorted(
+        (k, v) for k, v in args.items() if k not in AGGREGATE_RESERVED)))
+    if DYNAMIC_AGGREGATE_CACHE_TTL > 0:
+        with _aggregate_lock:
+            cached = _aggregate_cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                _aggregate_cache.move_to_end(key)
+                return cached[1]
+
+    names = [f"{func}_{field}" if field else func for func, field in metrics]
+    selects = [f"{exprs[f]} AS `{f}`" for f in group_by]
+    for (func, field), name in zip(metrics, names):
+        selects.append(f"{func.upper()}({exprs[field] if field else '*'}) AS `{name}`")
+    sql = f"SELECT {', '.join(selects)} FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if group_by:
+        grouped = ", ".join(exprs[f] for f in group_by)
+        sql += f" GROUP BY {grouped} ORDER BY {grouped} LIMIT %s"
+        params.append(DYNAMIC_AGGREGATE_MAX_GROUPS + 1)
+
+    with db_cursor() as cur:
+        cur.execute(sql, params)
+        groups = cur.fetchall()
+
+    truncated = len(groups) > DYNAMIC_AGGREGATE_MAX_GROUPS
+    groups = groups[:DYNAMIC_AGGREGATE_MAX_GROUPS]
+    for row in groups:
+        # SUM and AVG come back as DECIMAL
+        for name in names:
+            if isinstance(row[name], Decimal):
+                row[name] = int(row[name]) if row[name] == row[name].to_integral_value() else float(row[name])
+
+    result = {"groups": groups, "truncated": truncated}
+    if DYNAMIC_AGGREGATE_CACHE_TTL > 0:
+        _cache_aggregate(key, result)
+    return result
+
+
+def _cache_aggregate(key, result):
+    now = time.monotonic()
+    with _aggregate_lock:
+        for stale in [k for k, (expires_at, _r) in _aggregate_cache.items() if expires_at <= now]:
+            del _aggregate_cache[stale]
+        _aggregate_cache[key] = (now + DYNAMIC_AGGREGATE_CACHE_TTL, result)
+        _aggregate_cache.move_to_end(key)
+        while len(_aggregate_cache) > DYNAMIC_AGGREGATE_CACHE_SIZE:
+            _aggregate_cache.popitem(last=False)
+
+
+def _forget_aggregates(table_name):
+    with _aggregate_lock:
+        for key in [k for k in _aggregate_cache if k[0] == table_name]:
+            del _aggregate_cache[key]
 
-    cursor.execute(sql, values)
-    connector.commit()
 
-    if cursor.rowcount == 0:
+# ================= INDEXES =================
+def _index_name(table_name, fields):
+    name = f"dx_{table_name}_{'_'.join(fields)}"
+    if len(name) > 64:
+        name = f"dx_{hashlib.sha1(name.encode()).hexdigest()[:16]}"
+    return name
+
+
+def create_dynamic_index(table_name: str, fields: list):
+    """Create a secondary index on declared fields of a dynamic table and return its name"""
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+    meta = schema_cache.get_fields(table_name)
+    columns = {c["field_name"]: c["data_type"] for c in meta}
+    if not columns:
+        raise ValueError(f"Table {table_name} not found")
+    if _is_document(meta):
+        raise ValueError("Document tables are indexed by marking fields filterable")
+    if not fields or len(fields) > 4:
+        raise ValueError("An index needs between 1 and 4 fields")
+
+    parts = []
+    for f in fields:
+        if f not in columns:
+            raise ValueError(f"Unknown field: {f}")
+        # TEXT columns can only be indexed on a prefix
+        parts.append(f"`{f}`(191)" if columns[f] == "text" else f"`{f}`")
+
+    name = _index_name(table_name, fields)
+    with db_cursor() as cursor:
+        cursor.execute(f"CREATE INDEX `{name}` ON `{table_name}` ({', '.join(parts)}) ALGORITHM=INPLACE LOCK=NONE")
+    return name
+
+
+def list_dynamic_indexes(table_name: str):
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+    meta = schema_cache.get_fields(table_name)
+    if _is_document(meta):
+        return [{"name": f"{DOCUMENT_INDEX_TABLE}:{field}", "fields": [field]} for field in _indexed_fields(meta)]
+    with db_cursor() as cursor:
+        cursor.execute(f"SHOW INDEX FROM `{table_name}`")
+        rows = cursor.fetchall()
+
+    indexes = {}
+    for row in rows:
+        if row["Key_name"] == "PRIMARY":
+            continue
+        indexes.setdefault(row["Key_name"], []).append((row["Seq_in_index"], row["Column_name"]))
+    return [{"name": name, "fields": [c for _seq, c in sorted(cols)]} for name, cols in indexes.items()]
+
+
+def drop_dynamic_index(table_name: str, index_name: str):
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+    if not is_valid_identifier(index_name) or not index_name.startswith("dx_"):
+        raise ValueError("Only dynamic field indexes can be dropped")
+    if _is_document(schema_cache.get_fields(table_name)):
+        raise ValueError("Document table indexes are dropped with their filterable field")
+    if index_name not in {i["name"] for i in list_dynamic_indexes(table_name)}:
+        raise ValueError(f"Index {index_name} not found")
+    with db_cursor() as cursor:
+        cursor.execute(f"DROP INDEX `{index_name}` ON `{table_name}` ALGORITHM=INPLACE LOCK=NONE")
+
+
+# ================= UPDATE DATA =================
+def update_dynamic_data(table_name: str, record_id: int, data: dict):
+    if not is_valid_identifier(table_name):
+        raise ValueError("Invalid table name")
+
+    if not data:
+        raise ValueError("No data provided for update")
+
+    # Edit forms send the whole record back, id included
+    if "id" in data:
+        if str(data["id"]) != str(record_id):
+            raise ValueError("id does not match the record being updated")
+        data = {k: v for k, v in data.items() if k != "id"}
+        if not data:
+            raise ValueError("No data provided for update")
+
+    validator = get_validator(table_name)
+    columns = schema_cache.get_fields(table_name)
+    if _is_document(columns):
+        sql = _statement("update_document", table_name)
+        patch = _to_document(validator, data, keep_nulls=True)
+        values = (json.dumps(patch), table_name, record_id)
+        indexed = {f: dt for f, dt in _indexed_fields(columns).items() if f in patch}
+        if indexed:
+            with db_cursor() as cursor:
+                cursor.execute(sql, values)
+                updated = cursor.rowcount
+                if updated:
+                    cleared = [(table_name, f, record_id) for f in indexed if patch[f] is None]
+                    if cleared:
+                        cursor.executemany(_statement("unindex_document_field", table_name), cleared)
+                    _write_index_entries(cursor, _index_entries(table_name, record_id, patch, indexed))
+            _forget_aggregates(table_name)
+            if updated == 0:
+                raise ValueError(f"Record with id {record_id} not found in table {table_name}")
+            return
+    else:
+        columns, values = _checked_columns(validator, data)
+        sql = _statement("update", table_name, columns)
+        values.append(record_id)
+
+    with prepared_cursor(sql) as cursor:
+        cursor.execute(sql, values)
+        updated = cursor.rowcount
+    _forget_aggregates(table_name)
+
+    if updated == 0:
         raise ValueError(f"Record with id {record_id} not found in table {table_name}")
 
 
@@ -181,11 +1207,33 @@ def delete_dynamic_data(table_name: str, record_id: int):
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
 
-    sql = f"DELETE FROM `{table_name}` WHERE id = %s"
-    cursor.execute(sql, (record_id,))
-    connector.commit()
+    document = _is_document(schema_cache.get_fields(table_name))
+    if document:
+        sql = f"DELETE FROM `{DOCUMENT_TABLE}` WHERE table_name = %s AND id = %s"
+        params = (table_name, record_id)
+    else:
+        sql = f"DELETE FROM `{table_name}` WHERE id = %s"
+        params = (record_id,)
+    with db_cursor() as cursor:
+        cursor.execute(sql, params)
+        deleted = cursor.rowcount
+        if deleted and document:
+            cursor.execute(f"DELETE FROM `{DOCUMENT_INDEX_TABLE}` WHERE table_name = %s AND id = %s",
+                           (table_name, record_id))
+        if deleted:
+            # Same transaction, so a sync never sees the row gone without its tombstone
+            cursor.execute(f"""
+                INSERT INTO `{TOMBSTONE_TABLE}` (table_name, id) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6)
+            """, (table_name, record_id))
+            cursor.execute(f"""
+                DELETE FROM `{TOMBSTONE_TABLE}`
+                WHERE deleted_at < NOW(6) - INTERVAL %s SECOND
+                LIMIT 1000
+            """, (DYNAMIC_TOMBSTONE_RETENTION,))
+    _forget_aggregates(table_name)
 
-    if cursor.rowcount == 0:
+    if deleted == 0:
         raise ValueError(f"Record with id {record_id} not found in table {table_name}")
 
 
@@ -197,22 +1245,50 @@ def delete_dynamic_field(table_name: str, field_name: str):
     if not is_valid_identifier(field_name):
         raise ValueError("Invalid field name")
 
+    field = next((c for c in schema_cache.get_fields(table_name) if c["field_name"] == field_name), None)
+    document = field is not None and field["storage"] == "document"
+
     try:
-        # Remove field from metadata
-        cursor.execute("""
-            DELETE FROM dynamic_table_meta
-            WHERE table_name = %s AND field_name = %s
-        """, (table_name, field_name))
+        with db_cursor() as cursor:
+            # Remove field from metadata
+            cursor.execute("""
+                DELETE FROM dynamic_table_meta
+                WHERE table_name = %s AND field_name = %s
+            """, (table_name, field_name))
+
+            if document:
+                if field["filterable"]:
+                    cursor.execute(f"DELETE FROM `{DOCUMENT_INDEX_TABLE}` WHERE table_name = %s AND field_name = %s",
+                                   (table_name, field_name))
+            else:
+                # Drop column from table
+                sql = f"ALTER TABLE `{table_name}` DROP COLUMN `{field_name}`"
+                cursor.execute(sql)
+    finally:
+        schema_cache.invalidate()
+        _forget_aggregates(table_name)
 
-        # Drop column from table
-        sql = f"ALTER TABLE `{table_name}` DROP COLUMN `{field_name}`"
-        cursor.execute(sql)
+    if document:
+        _strip_document_field(table_name, field_name)
 
-        connector.commit()
 
-    except Exception as e:
-        connector.rollback()
-        raise e
+def _strip_document_field(table_name, field_name, batch_size=DYNAMIC_FIELD_DROP_BATCH):
+    """Remove a dropped field's values from stored documents, batch_size documents per transaction.
+
+    Otherwise they would come back if a field with the same name were added later.
+    """
+    path = f"$.{field_name}"
+    while True:
+        with db_cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE `{DOCUMENT_TABLE}` SET doc = JSON_REMOVE(doc, %s)
+                WHERE table_name = %s AND JSON_CONTAINS_PATH(doc, 'one', %s)
+                LIMIT %s
+            """, (path, table_name, path, batch_size))
+            stripped = cursor.rowcount
+        if stripped < batch_size:
+            break
+    _forget_aggregates(table_name)
 
 
 # ================= DELETE TABLE =================
@@ -220,22 +1296,27 @@ def delete_dynamic_table(table_name: str):
     if not is_valid_identifier(table_name):
         raise ValueError("Invalid table name")
 
-    try:
-        # Remove metadata entries
-        cursor.execute("""
-            DELETE FROM dynamic_table_meta
-            WHERE table_name = %s
-        """, (table_name,))
-
-        # Drop the table
-        sql = f"DROP TABLE IF EXISTS `{table_name}`"
-        cursor.execute(sql)
+    columns = schema_cache.get_fields(table_name)
 
-        connector.commit()
+    try:
+        with db_cursor() as cursor:
+            # Remove metadata entries
+            cursor.execute("""
+                DELETE FROM dynamic_table_meta
+                WHERE table_name = %s
+            """, (table_name,))
 
-    except Exception as e:
-        connector.rollback()
-        raise e
+            if _is_document(columns):
+                cursor.execute(f"DELETE FROM `{DOCUMENT_INDEX_TABLE}` WHERE table_name = %s", (table_name,))
+                cursor.execute(f"DELETE FROM `{DOCUMENT_TABLE}` WHERE table_name = %s", (table_name,))
+            else:
+                # Drop the table
+                sql = f"DROP TABLE IF EXISTS `{table_name}`"
+                cursor.execute(sql)
+            cursor.execute(f"DELETE FROM `{TOMBSTONE_TABLE}` WHERE table_name = %s", (table_name,))
+    finally:
+        schema_cache.invalidate()
+        _forget_aggregates(table_name)
 
 
 # ================= EXAMPLE USAGE =================
@@ -0,0 +1,57 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+
+Dates, times and datetimes are written as ISO 8601 strings by the encoder,
+so model to_dict() methods return them as they are. Without orjson the
+stdlib encoder is used with the same output format. Output is compact and
+keys keep their insertion order.
+"""
+
+import dataclasses
+import json
+import uuid
+from datetime import date, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(o):
+    # orjson handles dates, times, UUIDs and dataclasses itself; the stdlib encoder needs all of these
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, (Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def dumps_stdlib(obj):
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def dumps_orjson(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+dumps = dumps_orjson if orjson else dumps_stdlib
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serializes jsonify() and app.json with dumps(); calls that pass options keep Flask's encoder"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
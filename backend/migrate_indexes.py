@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the composite indexes declared in models.py.
+Run this script to create any of those indexes missing from an existing database.
+"""
+
+from models import Appointment, Alert, Doctor
+from config import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB, MYSQL_PORT
+import logging
+import mysql.connector as con
+
+INDEXED_MODELS = [Appointment, Alert, Doctor]
+
+def migrate_indexes():
+    """Create the model indexes that do not exist yet"""
+    try:
+        # Connect to database directly for migration
+        connector = con.connect(
+            host=MYSQL_HOST,
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
+            database=MYSQL_DB,
+            port=MYSQL_PORT
+        )
+        cursor = connector.cursor()
+
+        for model in INDEXED_MODELS:
+            table = model.__table__
+            cursor.execute(f"SHOW INDEX FROM `{table.name}`")
+            existing = {row[2] for row in cursor.fetchall()}
+
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if index.name in existing:
+                    print(f"✅ {index.name} already exists on {table.name}")
+                    continue
+
+                columns = ', '.join(f"`{column.name}`" for column in index.columns)
+                print(f"⏳ Creating {index.name} on {table.name} ({columns})...")
+                # Online DDL: reads and writes continue while the index builds
+                cursor.execute(
+                    f"CREATE INDEX `{index.name}` ON `{table.name}` ({columns}) ALGORITHM=INPLACE LOCK=NONE"
+                )
+                print(f"✅ Created {index.name}")
+
+        connector.commit()
+        print("✅ Index migration complete")
+
+    except Exception as e:
+        print(f"❌ Error migrating indexes: {e}")
+        if 'connector' in locals():
+            connector.rollback()
+    finally:
+        if 'connector' in locals():
+            connector.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_indexes()
@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import bcrypt
 import jwt
@@ -65,7 +67,7 @@ class User(db.Model):
             'username': self.username,
             'email': self.email,
             'fullName': self.full_name,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'createdAt': self.created_at,
             'isActive': self.is_active
         }
 
@@ -105,8 +107,8 @@ class UserSession(db.Model):
             'userId': self.user_id,
             'ipAddress': self.ip_address,
             'userAgent': self.user_agent,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'expiresAt': self.expires_at.isoformat() if self.expires_at else None,
+            'createdAt': self.created_at,
+            'expiresAt': self.expires_at,
             'isActive': self.is_active
         }
 
@@ -209,8 +211,8 @@ class Hospital(db.Model):
             'establishedYear': self.established_year,
             'accreditation': self.accreditation,
             'description': self.description,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
 
 class Farmer(db.Model):
@@ -230,8 +232,8 @@ class Farmer(db.Model):
             'mobileNumber': self.mobile_number,
             'location': self.location,
             'landArea': self.land_area,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
 
 class Doctor(db.Model):
@@ -244,6 +246,11 @@ class Doctor(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Doctors per hospital (delete_hospital)
+        db.Index('ix_doctors_hospital', 'hospital_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.dr_name,  # Use dr_name as id for frontend compatibility
@@ -251,8 +258,8 @@ class Doctor(db.Model):
             'hospitalId': self.hospital_id,
             'gender': self.gender,
             'time': self.time,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
 
 class Appointment(db.Model):
@@ -276,6 +283,15 @@ class Appointment(db.Model):
     # Relationship
     creator = db.relationship('User', backref='created_appointments')
 
+    __table_args__ = (
+        # Slot conflict check in create_appointment
+        db.Index('ix_appointments_slot', 'hospital_id', 'appointment_date', 'appointment_time', 'status'),
+        # A patient's appointments, newest first (get_my_appointments)
+        db.Index('ix_appointments_patient', 'patient_email', 'appointment_date', 'appointment_time', 'id'),
+        # All appointments, newest first (get_appointments)
+        db.Index('ix_appointments_schedule', 'appointment_date', 'appointment_time', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -285,13 +301,13 @@ class Appointment(db.Model):
             'hospitalId': self.hospital_id,
             'department': self.department,
             'doctorName': self.doctor_name,
-            'appointmentDate': self.appointment_date.isoformat() if self.appointment_date else None,
-            'appointmentTime': self.appointment_time.isoformat() if self.appointment_time else None,
+            'appointmentDate': self.appointment_date,
+            'appointmentTime': self.appointment_time,
             'symptoms': self.symptoms,
             'status': self.status,
             'createdBy': self.created_by,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
 
 class Alert(db.Model):
@@ -309,6 +325,11 @@ class Alert(db.Model):
     # Relationship
     creator = db.relationship('User', backref='alerts')
 
+    __table_args__ = (
+        # Active alerts, newest first (get_alerts)
+        db.Index('ix_alerts_active_created', 'is_active', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -316,8 +337,8 @@ class Alert(db.Model):
             'message': self.message,
             'severity': self.severity,
             'createdBy': self.created_by,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at,
             'isActive': self.is_active
         }
 
@@ -352,8 +373,8 @@ class Service(db.Model):
             'isActive': self.is_active,
             'isBuiltin': self.is_builtin,
             'createdBy': self.created_by,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
 
 class Page(db.Model):
@@ -385,6 +406,58 @@ class Page(db.Model):
             'isBuiltin': self.is_builtin,
             'isMainTab': self.is_main_tab,
             'createdBy': self.created_by,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
+        }
+
+class DashboardField(db.Model):
+    __tablename__ = 'dashboard_fields'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=True)
+    category = db.Column(db.String(100), nullable=True)
+    db_strategy = db.Column(db.String(50), nullable=True)
+    schema = db.Column(db.JSON, nullable=True)  # the inputs the field was created with
+    table_name = db.Column(db.String(255), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'db_strategy': self.db_strategy,
+            'schema': self.schema,
+            'table_name': self.table_name,
+            'created_at': self.created_at
+        }
+
+class CollectionVersion(db.Model):
+    """Change counter for a table whose list endpoint answers conditional GETs (see collection_versions.py)"""
+    __tablename__ = 'collection_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Tables whose list endpoints answer conditional GETs
+TRACKED_COLLECTIONS = {model.__tablename__ for model in (Hospital, Doctor, Farmer, Alert, Page, Service)}
+
+def bump_collections(connection, names):
+    table = CollectionVersion.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.name.in_(sorted(names)))
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_collections(session, _flush_context):
+    # new/dirty/deleted still hold the pre-flush state here, and the update joins the same transaction
+    names = {obj.__tablename__ for obj in session.new} | {obj.__tablename__ for obj in session.deleted}
+    names.update(obj.__tablename__ for obj in session.dirty if session.is_modified(obj))
+    names &= TRACKED_COLLECTIONS
+    if names:
+        bump_collections(session.connection(), names)
@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import date, datetime, time
+from flask import jsonify, make_response
+from sqlalchemy import and_, or_
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+class PaginationError(ValueError):
+    """Raised for an invalid limit or cursor"""
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, time)) else v for v in values],
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor_values(cursor, count):
+    """Decode a cursor into its list of `count` raw JSON values"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != count:
+        raise PaginationError('Invalid cursor')
+    return values
+
+def parse_limit(limit):
+    """Page size from a `limit` query value (None for the default), capped at MAX_PAGE_SIZE"""
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+def decode_cursor(cursor, order):
+    values = decode_cursor_values(cursor, len(order))
+
+    decoded = []
+    for (column, _descending), value in zip(order, values):
+        python_type = column.type.python_type
+        try:
+            if python_type in (date, datetime, time):
+                value = python_type.fromisoformat(value)
+            elif python_type is float and type(value) is int:
+                value = float(value)
+            elif type(value) is not python_type:
+                raise TypeError(value)
+        except (ValueError, TypeError):
+            raise PaginationError('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+def paginate(query, order, args):
+    """Apply keyset pagination to a query.
+
+    `order` lists (column, descending) pairs and must end with a unique
+    column so the sort is stable. When the request has neither `limit` nor
+    `cursor`, all rows are returned and the page info is None. Otherwise
+    returns one page and {'nextCursor': ..., 'limit': ...}; nextCursor is
+    None on the last page. Each page is an index range scan, so its cost
+    does not grow with the table.
+    """
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+    cursor = args.get('cursor')
+    limit = args.get('limit')
+    if cursor is None and limit is None:
+        return query.all(), None
+
+    limit = parse_limit(limit)
+
+    if cursor:
+        values = decode_cursor(cursor, order)
+        # (a, b, c) after (x, y, z): a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        clauses = []
+        for i, (column, descending) in enumerate(order):
+            equal = [prev == value for (prev, _desc), value in zip(order[:i], values[:i])]
+            clauses.append(and_(*equal, column < values[i] if descending else column > values[i]))
+        query = query.filter(or_(*clauses))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _desc in order])
+    return rows, {'nextCursor': next_cursor, 'limit': limit}
+
+def page_response(body, page, status=200):
+    """jsonify a list response, adding the page info when the request was paginated.
+
+    Dict bodies get the page info merged in; every paginated response also
+    carries the next cursor in an X-Next-Cursor header.
+    """
+    if page is None:
+        return jsonify(body), status
+    if isinstance(body, dict):
+        body = {**body, **page}
+    response = make_response(jsonify(body), status)
+    if page['nextCursor']:
+        response.headers['X-Next-Cursor'] = page['nextCursor']
+    return response
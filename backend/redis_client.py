@@ -6,3 +6,9 @@ redis_client = redis.Redis(
     port=REDIS_PORT,
     decode_responses=True
 )
+
+# Raw bytes client for binary payloads such as encoded queue tasks
+redis_binary_client = redis.Redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT
+)
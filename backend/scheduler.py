@@ -1,14 +1,327 @@
-import json
 import heapq
-from threading import Lock
+import itertools
+import logging
+import math
+import secrets
+import time
+from collections import Counter, deque
+from threading import Lock, Thread
+from redis_client import redis_binary_client
+from task_codec import encode, decode
+from config import (
+    COALESCE_WINDOW, ADMISSION_QUEUE_CAPACITY, ADMISSION_PRIORITY_CAPACITY,
+    ADMISSION_TENANT_CAPACITY, ADMISSION_DRAIN_RATE, PRIORITY_AGING_RATE,
+    FAIR_SHARE_COST, ADMISSION_FORWARD_DEPTH, ADMISSION_FORWARD_BATCH, ADMISSION_FORWARD_INTERVAL
+)
+
+QUEUE_KEY = "admission_queue"
+
+class QueueFull(Exception):
+    """Raised when a task is shed because the admission queue is at capacity"""
+
+    def __init__(self, priority, retry_after):
+        super().__init__(f"Admission queue full for priority {priority}")
+        self.priority = priority
+        self.retry_after = retry_after
+
+class QueuedTask:
+    __slots__ = ('task_id', 'ckey', 'payload', 'tenant', 'priority', 'enqueued_at', 'removed')
+
+    def __init__(self, task_id, ckey, payload, tenant, priority, enqueued_at):
+        self.task_id = task_id
+        self.ckey = ckey
+        self.payload = payload
+        self.tenant = tenant
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.removed = False
+
+    def aged_key(self, aging_rate):
+        # priority + aging_rate * (now - enqueued_at), minus the shared aging_rate * now term
+        return self.priority - aging_rate * self.enqueued_at
+
+class FairQueue:
+    """Bounded priority queue with priority aging and weighted fair sharing across tenants.
+
+    Each tenant (user) has its own queue ordered by aged priority. Tenants
+    are served by start-time fair queuing: every task served costs the
+    tenant `share_cost / weight` priority points, so one tenant cannot
+    monopolise the workers by submitting high-priority tasks, and waiting
+    tasks gain `aging_rate` priority points per second.
+    Not thread-safe; callers hold a lock.
+    """
+
+    def __init__(self, capacity=ADMISSION_QUEUE_CAPACITY, priority_capacity=ADMISSION_PRIORITY_CAPACITY,
+                 tenant_capacity=ADMISSION_TENANT_CAPACITY, aging_rate=PRIORITY_AGING_RATE,
+                 share_cost=FAIR_SHARE_COST, drain_rate=ADMISSION_DRAIN_RATE, clock=time.time):
+        self.capacity = capacity
+        self.priority_capacity = priority_capacity
+        self.tenant_capacity = tenant_capacity
+        self.aging_rate = aging_rate
+        self.share_cost = share_cost
+        self.drain_rate = drain_rate
+        self.clock = clock
+
+        self.by_priority = {}        # priority -> deque of QueuedTask in arrival order (for shedding)
+        self.priority_counts = Counter()
+        self.tenant_heaps = {}       # tenant -> heap of (-aged key, seq, QueuedTask)
+        self.tenant_counts = Counter()
+        self.tenant_weights = {}
+        self.virtual_time = {}       # tenant -> virtual service time
+        self.global_virtual_time = 0.0
+        self.ready = []              # heap of (-score, seq, tenant, version)
+        self.tenant_versions = {}    # tenant -> seq of its only valid entry in `ready`
+        self.shed_counts = Counter()
+        self.depth = 0
+        self._seq = itertools.count()
+
+    def retry_after(self, priority):
+        """Seconds until the tasks ahead of this priority should have drained"""
+        ahead = sum(count for p, count in self.priority_counts.items() if p >= priority)
+        return max(1, min(300, math.ceil(ahead / self.drain_rate)))
+
+    def push(self, task_id, ckey, payload, tenant, priority, weight=1.0):
+        """Queue a task and return the tasks shed to make room for it.
+
+        Raises QueueFull if the task itself is shed.
+        """
+        if (self.priority_counts[priority] >= self.priority_capacity
+                or self.tenant_counts[tenant] >= self.tenant_capacity):
+            self.shed_counts[priority] += 1
+            raise QueueFull(priority, self.retry_after(priority))
+
+        shed = []
+        if self.depth >= self.capacity:
+            victim = self._shed_lowest(priority)
+            if victim is None:
+                self.shed_counts[priority] += 1
+                raise QueueFull(priority, self.retry_after(priority))
+            shed.append(victim)
+
+        entry = QueuedTask(task_id, ckey, payload, tenant, priority, self.clock())
+        self.by_priority.setdefault(priority, deque()).append(entry)
+        self.priority_counts[priority] += 1
+        self.depth += 1
+
+        if tenant not in self.tenant_heaps:
+            self.tenant_heaps[tenant] = []
+            # A tenant returning from idle starts at the current virtual time
+            self.virtual_time[tenant] = max(self.virtual_time.get(tenant, 0.0), self.global_virtual_time)
+        self.tenant_weights[tenant] = weight
+        heap = self.tenant_heaps[tenant]
+        key = entry.aged_key(self.aging_rate)
+        is_new_head = not heap or key > -heap[0][0]
+        heapq.heappush(heap, (-key, next(self._seq), entry))
+        self.tenant_counts[tenant] += 1
+        if is_new_head:
+            self._schedule_tenant(tenant)
+        return shed
+
+    def pop(self):
+        """Remove and return the next task to run, or None if empty"""
+        while self.ready:
+            _score, _seq, tenant, version = heapq.heappop(self.ready)
+            if self.tenant_versions.get(tenant) != version:
+                continue
+            head = self._tenant_head(tenant)
+            if head is None:
+                self._drop_tenant(tenant)
+                continue
+            heapq.heappop(self.tenant_heaps[tenant])
+            self._remove(head)
+            start = self.virtual_time[tenant]
+            self.global_virtual_time = max(self.global_virtual_time, start)
+            self.virtual_time[tenant] = start + 1.0 / self.tenant_weights.get(tenant, 1.0)
+            self._schedule_tenant(tenant)
+            return head
+        return None
+
+    def oldest_enqueued_at(self, priority):
+        bucket = self.by_priority.get(priority)
+        while bucket and bucket[0].removed:
+            bucket.popleft()
+        return bucket[0].enqueued_at if bucket else None
+
+    def _tenant_head(self, tenant):
+        heap = self.tenant_heaps.get(tenant)
+        while heap and heap[0][2].removed:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _schedule_tenant(self, tenant):
+        head = self._tenant_head(tenant)
+        if head is None:
+            self._drop_tenant(tenant)
+            return
+        version = next(self._seq)
+        self.tenant_versions[tenant] = version
+        score = head.aged_key(self.aging_rate) - self.share_cost * self.virtual_time[tenant]
+        heapq.heappush(self.ready, (-score, version, tenant, version))
+        if len(self.ready) > 4 * len(self.tenant_heaps) + 64:
+            self.ready = [item for item in self.ready if self.tenant_versions.get(item[2]) == item[3]]
+            heapq.heapify(self.ready)
+
+    def _drop_tenant(self, tenant):
+        self.tenant_heaps.pop(tenant, None)
+        self.tenant_weights.pop(tenant, None)
+        self.tenant_counts.pop(tenant, None)
+        self.tenant_versions.pop(tenant, None)
+        # Idle tenants keep no state; they rejoin at the global virtual time
+        self.virtual_time.pop(tenant, None)
+
+    def _remove(self, entry):
+        entry.removed = True
+        self.depth -= 1
+        self.priority_counts[entry.priority] -= 1
+        if not self.priority_counts[entry.priority]:
+            del self.priority_counts[entry.priority]
+        self.tenant_counts[entry.tenant] -= 1
+        bucket = self.by_priority[entry.priority]
+        while bucket and bucket[0].removed:
+            bucket.popleft()
+        if len(bucket) > 2 * self.priority_counts[entry.priority] + 64:
+            self.by_priority[entry.priority] = deque(e for e in bucket if not e.removed)
+
+    def _shed_lowest(self, priority):
+        """Drop the newest task of the lowest queued priority below `priority`"""
+        lower = [p for p in self.priority_counts if p < priority]
+        if not lower:
+            return None
+        lowest = min(lower)
+        bucket = self.by_priority[lowest]
+        while bucket[-1].removed:
+            bucket.pop()
+        victim = bucket.pop()
+        self._remove(victim)
+        self.shed_counts[lowest] += 1
+        self._schedule_tenant(victim.tenant)
+        return victim
 
 # Simple in-memory priority queue for development
-admission_queue = []
+admission_queue = FairQueue()
 queue_lock = Lock()
-QUEUE_KEY = "admission_queue"
 
-def admit(task, priority=1):
-    """Add task to priority queue"""
+# Live coalescing keys: (task type, key) -> (taskId, expires_at)
+coalesced_tasks = {}
+coalesce_expiry = []  # min-heap of (expires_at, (task type, key))
+
+def _expire_coalesce_keys(now):
+    while coalesce_expiry and coalesce_expiry[0][0] <= now:
+        expires_at, ckey = heapq.heappop(coalesce_expiry)
+        entry = coalesced_tasks.get(ckey)
+        if entry and entry[1] == expires_at:
+            del coalesced_tasks[ckey]
+
+def _release_coalesce_key(task_id, ckey):
+    if ckey is not None and coalesced_tasks.get(ckey, (None,))[0] == task_id:
+        del coalesced_tasks[ckey]
+
+def admit(task, priority=1, coalesce_key=None, coalesce_window=COALESCE_WINDOW, weight=1.0):
+    """Add task to priority queue and return its taskId.
+
+    Tasks of the same type with the same coalesce_key inside the window
+    collapse into the first queued entry; late requesters get its taskId.
+    Tasks are shared fairly between users (task['username']) according to
+    `weight`. Raises QueueFull when the task is shed.
+    """
+    with queue_lock:
+        now = time.time()
+        ckey = None
+        if coalesce_key is not None:
+            _expire_coalesce_keys(now)
+            ckey = (str(task.get('type')), str(coalesce_key))
+            if ckey in coalesced_tasks:
+                return coalesced_tasks[ckey][0]
+
+        task.setdefault('taskId', secrets.token_hex(8))
+        task['enqueued_at'] = now
+        tenant = task.get('username') or 'system'
+        shed = admission_queue.push(task['taskId'], ckey, encode(task), tenant, priority, weight)
+        for victim in shed:
+            _release_coalesce_key(victim.task_id, victim.ckey)
+
+        if ckey is not None:
+            expires_at = now + coalesce_window
+            coalesced_tasks[ckey] = (task['taskId'], expires_at)
+            heapq.heappush(coalesce_expiry, (expires_at, ckey))
+
+        return task['taskId']
+
+def _pop_entries(count):
+    entries = []
+    with queue_lock:
+        while len(entries) < count:
+            entry = admission_queue.pop()
+            if entry is None:
+                break
+            entries.append(entry)
+    return entries
+
+def dequeue(count=1):
+    """Pop up to `count` tasks in fair, aged-priority order"""
+    return [decode(entry.payload) for entry in _pop_entries(count)]
+
+def forward_to_workers(depth=ADMISSION_FORWARD_DEPTH, limit=ADMISSION_FORWARD_BATCH):
+    """Move admitted tasks onto the Redis queue the workers read, and return how many moved.
+
+    The Redis queue is topped up to at most `depth` tasks, so the backlog
+    stays here where it is ordered fairly, aged and shed. Tasks are scored
+    by forwarding time, so workers pop them in the order this queue chose.
+    """
+    room = min(limit, depth - redis_binary_client.zcard(QUEUE_KEY))
+    if room <= 0:
+        return 0
+    entries = _pop_entries(room)
+    if not entries:
+        return 0
+    now = time.time()
+    try:
+        # Distinct, increasing scores keep the fair order within the batch
+        redis_binary_client.zadd(QUEUE_KEY, {entry.payload: now + i * 1e-6 for i, entry in enumerate(entries)})
+    except Exception:
+        with queue_lock:
+            for entry in entries:
+                try:
+                    for victim in admission_queue.push(entry.task_id, entry.ckey, entry.payload, entry.tenant, entry.priority):
+                        _release_coalesce_key(victim.task_id, victim.ckey)
+                except QueueFull:
+                    logging.warning(f"Dropped task {entry.task_id}: Redis unavailable and admission queue full")
+        raise
+    return len(entries)
+
+def _forward_loop():
+    while True:
+        try:
+            if forward_to_workers() >= ADMISSION_FORWARD_BATCH:
+                continue
+        except Exception as e:
+            logging.error(f"Admission forwarder error: {e}")
+        time.sleep(ADMISSION_FORWARD_INTERVAL)
+
+forwarder = None
+
+def start_forwarder():
+    """Start this process's thread that feeds admitted tasks to the workers"""
+    global forwarder
+    if forwarder is None:
+        forwarder = Thread(target=_forward_loop, name='admission-forwarder', daemon=True)
+        forwarder.start()
+
+def queue_stats():
+    """Current depth, oldest task age and shed counts per priority level"""
     with queue_lock:
-        # Use negative priority for min-heap behavior (higher priority = lower number)
-        heapq.heappush(admission_queue, (-priority, json.dumps(task)))
+        now = admission_queue.clock()
+        return {
+            'depth': admission_queue.depth,
+            'capacity': admission_queue.capacity,
+            'priorityCapacity': admission_queue.priority_capacity,
+            'tenantCapacity': admission_queue.tenant_capacity,
+            'tenants': len(admission_queue.tenant_heaps),
+            'depthByPriority': dict(sorted(admission_queue.priority_counts.items())),
+            'oldestAgeByPriority': {
+                p: round(now - admission_queue.oldest_enqueued_at(p), 3)
+                for p in sorted(admission_queue.priority_counts)
+            },
+            'shedByPriority': dict(sorted(admission_queue.shed_counts.items())),
+            'shedTotal': sum(admission_queue.shed_counts.values())
+        }
@@ -0,0 +1,123 @@
+import os
+import threading
+from db_pool import db_cursor
+from config import DYNAMIC_SCHEMA_VERSION_FILE
+
+def read_version(version_file):
+    """Version token of a version file: changes whenever bump_version() rewrites it"""
+    try:
+        st = os.stat(version_file)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def bump_version(version_file):
+    """Rewrite a version file (write and rename, so the inode changes)"""
+    os.makedirs(os.path.dirname(version_file) or '.', exist_ok=True)
+    temp = f"{version_file}.{os.getpid()}.{threading.get_ident()}"
+    with open(temp, 'w') as f:
+        f.write(str(os.getpid()))
+    os.replace(temp, version_file)
+
+class SchemaCache:
+    """In-process cache of dynamic_table_meta, invalidated across processes by a version file.
+
+    Every schema change rewrites the version file (write and rename, so the
+    inode changes). Readers stat the file on each lookup and drop their
+    cache when it has changed, which costs a local syscall instead of a
+    database round trip.
+    """
+
+    def __init__(self, version_file):
+        self.version_file = version_file
+        self.lock = threading.Lock()
+        self.version = None
+        self.fields = {}     # table name -> list of {field_name, data_type, show_ui, storage, filterable}
+        self.tables = None   # list of dynamic table names
+        self.derived = {}    # (table name, kind) -> object built from the table's fields
+        self.hits = 0
+        self.misses = 0
+
+    def get_fields(self, table_name):
+        """Metadata rows for a table, in definition order; empty if it is not a dynamic table"""
+        version = self._current_version()
+        with self.lock:
+            fields = self.fields.get(table_name)
+            if fields is not None:
+                self.hits += 1
+                return fields
+            self.misses += 1
+
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT field_name, data_type, show_ui, storage, filterable
+                FROM dynamic_table_meta
+                WHERE table_name = %s
+            """, (table_name,))
+            fields = cursor.fetchall()
+
+        self._store(version, lambda: self.fields.__setitem__(table_name, fields))
+        return fields
+
+    def get_derived(self, table_name, kind, build):
+        """build(fields) for a table, cached until the schema changes"""
+        key = (table_name, kind)
+        version = self._current_version()
+        with self.lock:
+            value = self.derived.get(key)
+            if value is not None:
+                return value
+
+        value = build(self.get_fields(table_name))
+        self._store(version, lambda: self.derived.__setitem__(key, value))
+        return value
+
+    def get_tables(self):
+        version = self._current_version()
+        with self.lock:
+            if self.tables is not None:
+                self.hits += 1
+                return self.tables
+            self.misses += 1
+
+        with db_cursor() as cursor:
+            cursor.execute("SELECT DISTINCT table_name FROM dynamic_table_meta")
+            tables = [row['table_name'] for row in cursor.fetchall()]
+
+        self._store(version, lambda: setattr(self, 'tables', tables))
+        return tables
+
+    def invalidate(self):
+        """Drop cached metadata here and in every other process"""
+        bump_version(self.version_file)
+        with self.lock:
+            self._reset(read_version(self.version_file))
+
+    def stats(self):
+        with self.lock:
+            return {
+                'cachedTables': len(self.fields),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _current_version(self):
+        version = read_version(self.version_file)
+        with self.lock:
+            if version != self.version:
+                self._reset(version)
+        return version
+
+    def _store(self, version, apply):
+        # Skip the store if the schema changed while we were querying
+        with self.lock:
+            if version == self.version:
+                apply()
+
+    def _reset(self, version):
+        self.version = version
+        self.fields = {}
+        self.tables = None
+        self.derived = {}
+
+schema_cache = SchemaCache(DYNAMIC_SCHEMA_VERSION_FILE)
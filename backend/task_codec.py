@@ -0,0 +1,188 @@
+"""
+Compact binary encoding for queued tasks.
+
+Layout (little-endian), version 1:
+    u8  version (1)
+    u8  task type code from TASK_TYPES, 0 = not a known type
+    u16 field flags
+    ... type string, if flagged
+    ... present fields in FIELDS order
+    ... extras: compact JSON of any remaining keys, to the end of the buffer
+
+Known fields are stored in fixed binary form: the 16-hex-digit taskId as
+8 raw bytes, ISO timestamps as microseconds, IPs as 4/16 bytes. A value
+that does not fit its fixed form (wrong type, unusual format) goes to the
+extras instead, so decode(encode(task)) == task for any JSON task.
+Payloads that start with '{' are legacy JSON and decode as before.
+"""
+
+import json
+import socket
+import struct
+from datetime import datetime, timedelta
+
+VERSION = 1
+
+# Append only: codes are stored in queued payloads
+TASK_TYPES = (None, 'user_login', 'user_registration', 'collect_metrics', 'appointment_booking', 'alert_processing')
+TYPE_CODES = {name: code for code, name in enumerate(TASK_TYPES) if name}
+
+EPOCH = datetime(1970, 1, 1)
+
+_HEADER = struct.Struct('<BBH')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+
+def _text(value):
+    if type(value) is str:
+        raw = value.encode('utf-8')
+        if len(raw) < 256:
+            return _U8.pack(len(raw)) + raw
+    return None
+
+def _unpack_text(buf, pos):
+    size = buf[pos]
+    pos += 1
+    return str(buf[pos:pos + size], 'utf-8'), pos + size
+
+def _hex_id(value):
+    # token_hex(8) output; anything that would not round-trip exactly is left to the extras
+    if type(value) is str and len(value) == 16:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            return None
+        if raw.hex() == value:
+            return raw
+    return None
+
+def _unpack_hex_id(buf, pos):
+    return buf[pos:pos + 8].hex(), pos + 8
+
+def _iso(value):
+    if type(value) is not str:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    delta = parsed - EPOCH
+    return _I64.pack((delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+def _unpack_iso(buf, pos):
+    return (EPOCH + timedelta(microseconds=_I64.unpack_from(buf, pos)[0])).isoformat(), pos + 8
+
+def _ip(value):
+    if type(value) is not str:
+        return None
+    family = socket.AF_INET6 if ':' in value else socket.AF_INET
+    try:
+        raw = socket.inet_pton(family, value)
+    except (OSError, ValueError):
+        return None
+    if socket.inet_ntop(family, raw) != value:
+        return None
+    return _U8.pack(len(raw)) + raw
+
+def _unpack_ip(buf, pos):
+    size = buf[pos]
+    family = socket.AF_INET6 if size == 16 else socket.AF_INET
+    return socket.inet_ntop(family, buf[pos + 1:pos + 1 + size]), pos + 1 + size
+
+def _int64(value):
+    if type(value) is int and -(1 << 63) <= value < (1 << 63):
+        return _I64.pack(value)
+    return None
+
+def _uint16(value):
+    if type(value) is int and 0 <= value < 65536:
+        return _U16.pack(value)
+    return None
+
+def _float(value):
+    return _F64.pack(value) if type(value) is float else None
+
+def _unpacker(st):
+    return lambda buf, pos: (st.unpack_from(buf, pos)[0], pos + st.size)
+
+# (key, pack value or return None if it has no fixed form, unpack); the flag bit is the position here
+FIELDS = (
+    ('taskId', _hex_id, _unpack_hex_id),
+    ('username', _text, _unpack_text),
+    ('user_id', _int64, _unpacker(_I64)),
+    ('timestamp', _iso, _unpack_iso),
+    ('enqueued_at', _float, _unpacker(_F64)),
+    ('ip', _ip, _unpack_ip),
+    ('attempts', _uint16, _unpacker(_U16)),
+    ('queue_score', _float, _unpacker(_F64)),
+    ('dequeued_at', _float, _unpacker(_F64)),
+)
+FIELD_BITS = {key: (1 << bit, pack) for bit, (key, pack, _unpack) in enumerate(FIELDS)}
+TYPE_TEXT_FLAG = 1 << 14
+EXTRAS_FLAG = 1 << 15
+
+def encode(task):
+    """Encode a task dict to bytes"""
+    type_code = 0
+    flags = 0
+    packed = {}
+    extras = {}
+    for key, value in task.items():
+        if key == 'type':
+            type_code = TYPE_CODES.get(value, 0) if type(value) is str else 0
+            if not type_code:
+                type_text = _text(value)
+                if type_text is None:
+                    extras[key] = value
+                else:
+                    flags |= TYPE_TEXT_FLAG
+            continue
+        field = FIELD_BITS.get(key)
+        raw = field[1](value) if field else None
+        if raw is None:
+            extras[key] = value
+        else:
+            flags |= field[0]
+            packed[key] = raw
+
+    parts = [_HEADER.pack(VERSION, type_code, flags)]
+    if flags & TYPE_TEXT_FLAG:
+        parts.append(type_text)
+    # Fields must be written in FIELDS order
+    if packed:
+        parts.extend(packed[key] for key, _pack, _unpack in FIELDS if key in packed)
+    if extras:
+        parts[0] = _HEADER.pack(VERSION, type_code, flags | EXTRAS_FLAG)
+        parts.append(json.dumps(extras, separators=(',', ':')).encode('utf-8'))
+    return b''.join(parts)
+
+def decode(payload):
+    """Decode bytes from encode(), or a legacy JSON payload (str or bytes)"""
+    if isinstance(payload, str):
+        return json.loads(payload)
+    if payload[:1] == b'{':
+        return json.loads(payload)
+
+    buf = payload
+    version, type_code, flags = _HEADER.unpack_from(buf, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported task encoding version {version}")
+    pos = _HEADER.size
+
+    task = {}
+    if type_code:
+        task['type'] = TASK_TYPES[type_code]
+    elif flags & TYPE_TEXT_FLAG:
+        task['type'], pos = _unpack_text(buf, pos)
+
+    for bit, (key, _pack, unpack) in enumerate(FIELDS):
+        if flags & (1 << bit):
+            task[key], pos = unpack(buf, pos)
+
+    if flags & EXTRAS_FLAG:
+        task.update(json.loads(buf[pos:]))
+    return task
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import defaultdict
+from task_store import get_connection
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is unbounded
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 300000, float('inf'))
+FLUSH_INTERVAL = 1.0  # seconds between flushes from a worker
+RETENTION_MINUTES = 24 * 60
+
+# Pending increments: (minute, task type, metric) -> bucket counts
+_pending = defaultdict(lambda: [0] * len(BUCKETS_MS))
+_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def bucket_for(ms):
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS) - 1
+
+
+def observe(task_type, metric, seconds):
+    """Record one observation (in seconds) for a task type"""
+    minute = int(time.time() // 60)
+    with _lock:
+        _pending[(minute, task_type or 'unknown', metric)][bucket_for(seconds * 1000)] += 1
+
+
+def record_task(task, started, finished):
+    """Record queue wait (enqueue to dequeue) and service time for a finished task"""
+    enqueued_at = task.get('enqueued_at')
+    dequeued_at = task.get('dequeued_at', started)
+    if enqueued_at is not None:
+        observe(task.get('type'), 'queue_wait', max(0.0, dequeued_at - enqueued_at))
+    observe(task.get('type'), 'service_time', finished - started)
+
+
+def flush(force=False):
+    """Write pending increments to the task store in one transaction"""
+    global _last_flush
+    now = time.time()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = now
+    rows = [
+        (minute, task_type, metric, bucket, count)
+        for (minute, task_type, metric), counts in pending.items()
+        for bucket, count in enumerate(counts) if count
+    ]
+    if not rows:
+        return
+    conn = get_connection()
+    with conn:
+        conn.executemany("""
+            INSERT INTO task_metrics (minute, task_type, metric, bucket, count) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (minute, task_type, metric, bucket) DO UPDATE SET count = count + excluded.count
+        """, rows)
+
+
+def purge_old(retention_minutes=RETENTION_MINUTES):
+    """Delete histogram rows older than the retention window"""
+    cutoff = int(time.time() // 60) - retention_minutes
+    conn = get_connection()
+    with conn:
+        return conn.execute('DELETE FROM task_metrics WHERE minute < ?', (cutoff,)).rowcount
+
+
+def _percentile(counts, total, pct):
+    target = total * pct / 100
+    seen = 0
+    for bound, count in zip(BUCKETS_MS, counts):
+        seen += count
+        if seen >= target:
+            return bound if bound != float('inf') else None
+    return None
+
+
+def snapshot(window_minutes=15):
+    """Per task type histograms of queue wait and service time over the last window"""
+    since = int(time.time() // 60) - window_minutes + 1
+    rows = get_connection().execute("""
+        SELECT task_type, metric, bucket, SUM(count) FROM task_metrics
+        WHERE minute >= ? GROUP BY task_type, metric, bucket
+    """, (since,)).fetchall()
+
+    histograms = defaultdict(lambda: [0] * len(BUCKETS_MS))
+    for task_type, metric, bucket, count in rows:
+        histograms[(task_type, metric)][bucket] += count
+
+    result = {}
+    for (task_type, metric), counts in sorted(histograms.items()):
+        total = sum(counts)
+        result.setdefault(task_type, {})[metric] = {
+            'count': total,
+            'p50Ms': _percentile(counts, total, 50),
+            'p90Ms': _percentile(counts, total, 90),
+            'p99Ms': _percentile(counts, total, 99),
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in zip(BUCKETS_MS, counts) if count}
+        }
+    return result
@@ -0,0 +1,116 @@
+import json
+import random
+import time
+from redis_client import redis_client, redis_binary_client
+from task_codec import encode, decode
+from config import TASK_MAX_ATTEMPTS, TASK_RETRY_BASE_DELAY, TASK_RETRY_MAX_DELAY, DEAD_LETTER_MAX
+
+QUEUE_KEY = "admission_queue"
+RETRY_KEY = "admission_queue:retry"                # zset of pending retries scored by due time
+DEAD_LETTER_KEY = "admission_queue:dead_letters"   # hash of taskId -> dead letter
+DEAD_LETTER_INDEX = "admission_queue:dead_letter_index"  # zset of taskId scored by failure time
+PROMOTE_BATCH = 100
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with equal jitter: half the delay is fixed, half random"""
+    delay = min(TASK_RETRY_MAX_DELAY, TASK_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def handle_failures(failures):
+    """Schedule a retry for each failed (task, error), or dead-letter it once out of attempts.
+
+    Returns {taskId: retry time} for retried tasks; tasks missing from it were dead-lettered.
+    """
+    now = time.time()
+    retries = {}
+    pipe = redis_binary_client.pipeline()
+    for task, error in failures:
+        task_id = task.get('taskId', 'unknown')
+        attempts = task.get('attempts', 0) + 1
+        task['attempts'] = attempts
+        task['last_error'] = error
+        if attempts < TASK_MAX_ATTEMPTS:
+            retry_at = now + backoff_delay(attempts)
+            pipe.zadd(RETRY_KEY, {encode(task): retry_at})
+            retries[task_id] = retry_at
+        else:
+            pipe.hset(DEAD_LETTER_KEY, task_id, json.dumps({
+                'task': task,
+                'error': error,
+                'attempts': attempts,
+                'failedAt': now
+            }))
+            pipe.zadd(DEAD_LETTER_INDEX, {task_id: now})
+    if failures:
+        pipe.execute()
+        if len(failures) > len(retries):
+            _trim_dead_letters()
+    return retries
+
+
+def promote_due(limit=PROMOTE_BATCH):
+    """Move retries whose backoff has elapsed back onto the admission queue"""
+    now = time.time()
+    due = redis_binary_client.zrangebyscore(RETRY_KEY, '-inf', now, start=0, num=limit)
+    promoted = 0
+    for member in due:
+        # Only the worker that removes the entry re-queues it
+        if not redis_binary_client.zrem(RETRY_KEY, member):
+            continue
+        task = decode(member)
+        task['enqueued_at'] = now
+        # A retry joins the tail; its original score would put it ahead of fresh work
+        task.pop('queue_score', None)
+        redis_binary_client.zadd(QUEUE_KEY, {encode(task): now})
+        promoted += 1
+    return promoted
+
+
+def list_dead_letters(limit=50, offset=0):
+    """Most recent dead letters first"""
+    task_ids = redis_client.zrevrange(DEAD_LETTER_INDEX, offset, offset + limit - 1)
+    if not task_ids:
+        return []
+    entries = redis_client.hmget(DEAD_LETTER_KEY, task_ids)
+    return [json.loads(entry) for entry in entries if entry]
+
+
+def dead_letter_stats():
+    return {
+        'deadLetters': redis_client.zcard(DEAD_LETTER_INDEX),
+        'pendingRetries': redis_binary_client.zcard(RETRY_KEY)
+    }
+
+
+def replay_dead_letter(task_id):
+    """Put a dead-lettered task back on the admission queue with a fresh attempt budget.
+
+    Returns False if there is no such dead letter.
+    """
+    entry = redis_client.hget(DEAD_LETTER_KEY, task_id)
+    if entry is None or not redis_client.hdel(DEAD_LETTER_KEY, task_id):
+        return False
+    redis_client.zrem(DEAD_LETTER_INDEX, task_id)
+    task = json.loads(entry)['task']
+    task['attempts'] = 0
+    task.pop('last_error', None)
+    task.pop('queue_score', None)
+    task['enqueued_at'] = time.time()
+    redis_binary_client.zadd(QUEUE_KEY, {encode(task): task['enqueued_at']})
+    return True
+
+
+def delete_dead_letter(task_id):
+    redis_client.zrem(DEAD_LETTER_INDEX, task_id)
+    return bool(redis_client.hdel(DEAD_LETTER_KEY, task_id))
+
+
+def _trim_dead_letters():
+    excess = redis_client.zcard(DEAD_LETTER_INDEX) - DEAD_LETTER_MAX
+    if excess > 0:
+        oldest = redis_client.zrange(DEAD_LETTER_INDEX, 0, excess - 1)
+        if oldest:
+            redis_client.hdel(DEAD_LETTER_KEY, *oldest)
+            redis_client.zrem(DEAD_LETTER_INDEX, *oldest)
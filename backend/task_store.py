@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+from config import TASK_RESULTS_DB, TASK_RESULT_TTL
+
+# Expired rows are swept at most this often (seconds)
+PURGE_INTERVAL = 5 * 60
+
+_local = threading.local()
+_last_purge = 0.0
+
+
+def get_connection():
+    """Return this thread's connection to the result store, creating it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(TASK_RESULTS_DB, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS task_results (
+                task_id TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_task_results_expires_at ON task_results (expires_at)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS task_metrics (
+                minute INTEGER NOT NULL,
+                task_type TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (minute, task_type, metric, bucket)
+            )
+        """)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def save_result(task_id, result, ttl=TASK_RESULT_TTL):
+    """Insert or replace the result for a task"""
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO task_results (task_id, result, created_at, expires_at) VALUES (?, ?, ?, ?)',
+            (task_id, json.dumps(result), now, now + ttl)
+        )
+    _maybe_purge(now)
+
+
+def save_results(results, ttl=TASK_RESULT_TTL):
+    """Insert or replace many results in a single transaction.
+
+    ``results`` maps taskId to result dict.
+    """
+    if not results:
+        return
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO task_results (task_id, result, created_at, expires_at) VALUES (?, ?, ?, ?)',
+            [(task_id, json.dumps(result), now, now + ttl) for task_id, result in results.items()]
+        )
+    _maybe_purge(now)
+
+
+def get_result(task_id):
+    """Return the stored result for a task, or None if unknown or expired"""
+    row = get_connection().execute(
+        'SELECT result FROM task_results WHERE task_id = ? AND expires_at > ?',
+        (task_id, time.time())
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def purge_expired():
+    """Delete expired results and return how many rows were removed"""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute('DELETE FROM task_results WHERE expires_at <= ?', (time.time(),))
+    return cursor.rowcount
+
+
+def _maybe_purge(now):
+    global _last_purge
+    if now - _last_purge >= PURGE_INTERVAL:
+        _last_purge = now
+        purge_expired()
@@ -0,0 +1,211 @@
+import logging
+import os
+import random
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+class TimerWheel:
+    """Hierarchical timer wheel.
+
+    Level 0 has one slot per tick. Each higher level has slots spanning a
+    whole rotation of the level below, and its slots are cascaded down as
+    time reaches them. Timers beyond the top level wait in an overflow list.
+    Scheduling and expiry are O(1) per timer.
+    """
+
+    def __init__(self, slots=(60, 60, 24)):
+        self.slots = slots
+        self.spans = []
+        span = 1
+        for n in slots:
+            self.spans.append(span)
+            span *= n
+        self.total_span = span
+        self.levels = [[[] for _ in range(n)] for n in slots]
+        self.overflow = []
+        self.current_tick = 0
+
+    def schedule(self, ticks, item):
+        """Fire `item` after `ticks` ticks (at least one)"""
+        self._insert(self.current_tick + max(1, int(ticks)), item)
+
+    def advance(self):
+        """Move to the next tick and return the items that fire on it"""
+        self.current_tick += 1
+        tick = self.current_tick
+
+        # Cascade from the top level down so timers can fall through several levels at once
+        if tick % self.total_span == 0:
+            overflow, self.overflow = self.overflow, []
+            for due, item in overflow:
+                self._insert(due, item)
+        for level in range(len(self.slots) - 1, 0, -1):
+            span = self.spans[level]
+            if tick % span == 0:
+                slot = (tick // span) % self.slots[level]
+                bucket, self.levels[level][slot] = self.levels[level][slot], []
+                for due, item in bucket:
+                    self._insert(due, item)
+
+        slot = tick % self.slots[0]
+        bucket, self.levels[0][slot] = self.levels[0][slot], []
+        return [item for _due, item in bucket]
+
+    def _insert(self, due, item):
+        delta = due - self.current_tick
+        for level, n in enumerate(self.slots):
+            span = self.spans[level]
+            if delta < span * n:
+                self.levels[level][(due // span) % n].append((due, item))
+                return
+        self.overflow.append((due, item))
+
+class RecurringJob:
+    def __init__(self, name, func, interval, jitter):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_run = None
+        self.last_duration = None
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error = None
+
+    def next_delay(self):
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def run(self):
+        started = time.time()
+        try:
+            self.func()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logging.error(f"Scheduled job {self.name} failed: {e}")
+        finally:
+            duration = time.time() - started
+            self.runs += 1
+            self.last_run = started
+            self.last_duration = duration
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+
+    def to_dict(self):
+        return {
+            'interval': self.interval,
+            'jitter': self.jitter,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'lastRun': self.last_run,
+            'lastDurationMs': round(self.last_duration * 1000, 2) if self.last_duration is not None else None,
+            'avgDurationMs': round(self.total_duration / self.runs * 1000, 2) if self.runs else None,
+            'maxDurationMs': round(self.max_duration * 1000, 2),
+            'lastError': self.last_error
+        }
+
+class FileLockLeader:
+    """Leader election between processes on one host using an exclusive file lock.
+
+    The lock is held for the life of the process, so when the leader exits
+    another process acquires it on its next attempt.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def try_acquire(self):
+        if self.fd is not None:
+            return True
+        if fcntl is None and msvcrt is None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
+
+    @property
+    def is_leader(self):
+        return self.fd is not None
+
+class JobScheduler:
+    """Runs recurring in-process jobs on a timer wheel in one background thread.
+
+    Only the process holding the leader lock runs jobs; the others keep
+    their wheels turning and take over if the leader goes away.
+    """
+
+    def __init__(self, lock_path, tick=1.0):
+        self.tick = tick
+        self.wheel = TimerWheel()
+        self.leader = FileLockLeader(lock_path)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def register(self, name, func, interval, jitter=0.1, first_run=None):
+        """Run `func` every `interval` seconds (+/- jitter fraction).
+
+        The first run happens after `first_run` seconds, defaulting to one jittered interval.
+        """
+        job = RecurringJob(name, func, interval, jitter)
+        with self.lock:
+            self.jobs[name] = job
+            delay = job.next_delay() if first_run is None else first_run
+            self.wheel.schedule(delay / self.tick, job)
+        return job
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='job-scheduler', daemon=True)
+            self.thread.start()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'leader': self.leader.is_leader,
+                'pid': os.getpid(),
+                'jobs': {name: job.to_dict() for name, job in self.jobs.items()}
+            }
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            with self.lock:
+                due = self.wheel.advance()
+            if not due:
+                continue
+            is_leader = self.leader.try_acquire()
+            for job in due:
+                if is_leader:
+                    job.run()
+                else:
+                    job.skipped += 1
+                with self.lock:
+                    self.wheel.schedule(job.next_delay() / self.tick, job)
@@ -1,17 +1,71 @@
-import json
 import time
-from redis_client import redis_client
-from worker_pool import process
+from redis_client import redis_binary_client
+from task_codec import decode
+from worker_pool import TaskLanes
+from task_store import save_results
+from task_retry import handle_failures, promote_due
+from task_metrics import record_task, flush as flush_metrics
+from config import WORKER_BATCH_SIZE, WORKER_BATCH_LINGER_MS
 
 QUEUE_KEY = "admission_queue"
 
+def dequeue_batch():
+    """Pop up to WORKER_BATCH_SIZE (member, score) entries, lingering briefly to fill a partial batch"""
+    entries = redis_binary_client.zpopmin(QUEUE_KEY, WORKER_BATCH_SIZE)
+    if entries and len(entries) < WORKER_BATCH_SIZE and WORKER_BATCH_LINGER_MS > 0:
+        deadline = time.monotonic() + WORKER_BATCH_LINGER_MS / 1000
+        while len(entries) < WORKER_BATCH_SIZE and time.monotonic() < deadline:
+            time.sleep(min(0.005, WORKER_BATCH_LINGER_MS / 1000))
+            entries += redis_binary_client.zpopmin(QUEUE_KEY, WORKER_BATCH_SIZE - len(entries))
+    return entries
+
 print("Worker started...")
 
+lanes = TaskLanes(on_complete=record_task)
+
 while True:
-    task = redis_client.zpopmin(QUEUE_KEY)
-    if task:
-        data = json.loads(task[0][0])
-        result = process(data)
-        print("Processed:", result)
-    else:
+    entries = dequeue_batch()
+    if entries:
+        dequeued_at = time.time()
+        tasks = []
+        members = {}
+        for member, score in entries:
+            task = decode(member)
+            task['dequeued_at'] = dequeued_at
+            task['queue_score'] = score
+            members[id(task)] = member
+            tasks.append(task)
+
+        # Tasks that do not fit their lane or its backlog go to the back of the queue,
+        # so the next pop reaches the other types behind them
+        rejected = lanes.submit(tasks)
+        if rejected:
+            requeued_at = time.time()
+            redis_binary_client.zadd(QUEUE_KEY, {members[id(task)]: requeued_at for task in rejected})
+
+    # Failed tasks are retried later from the delayed set, so they never block this loop
+    finished = lanes.collect()
+    failures = [(task, result.get('error')) for task, result in finished if result.get('status') == 'error']
+    if failures:
+        retries = handle_failures(failures)
+        for task, result in finished:
+            if result.get('status') == 'error':
+                result['attempts'] = task['attempts']
+                retry_at = retries.get(task.get('taskId', 'unknown'))
+                if retry_at is not None:
+                    result['status'] = 'retrying'
+                    result['retryAt'] = retry_at
+                else:
+                    result['deadLettered'] = True
+    promote_due()
+
+    # Persist everything that finished since the last pass in one transaction
+    if finished:
+        save_results({task.get('taskId', 'unknown'): result for task, result in finished})
+        print(f"Processed {len(finished)} task(s)")
+    flush_metrics()
+
+    if not entries and not lanes.in_flight_total():
         time.sleep(1)
+    elif not entries or len(rejected) == len(entries):
+        time.sleep(0.05)